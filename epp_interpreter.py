@@ -2,15 +2,23 @@
 
 from __future__ import annotations
 
+import ast
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+import http.client
 import json
+from keyword import iskeyword
+import operator
 import random
 import re
+import ssl
+import threading
 import time
-from typing import Any, Callable, Optional
+from types import CodeType, FunctionType, MappingProxyType
+from typing import Any, Callable, Mapping, NoReturn, Optional, Sequence
 import urllib.error
 import urllib.request
-from urllib.parse import urlsplit
+from urllib.parse import urljoin, urlsplit
 
 from epp_parser import (
     AddStatement,
@@ -37,6 +45,161 @@ from epp_parser import (
 )
 
 
+# Shared globals for eval(); builtins are supplied through the namespace.
+_EVAL_GLOBALS: dict[str, Any] = {"__builtins__": {}}
+
+# Expression plan kinds cached by EppInterpreter._expression_plan.
+_PLAN_CALL = 0
+_PLAN_NAME = 1
+_PLAN_EVAL = 2
+_PLAN_CONST = 3
+
+# Literal values a constant plan may hand out repeatedly; mutable literals such as
+# lists must still be built fresh by eval on every evaluation.
+_IMMUTABLE_LITERAL_TYPES = (int, float, complex, str, bytes, bool, type(None))
+
+# Control-flow codes returned by statement handlers and _execute_block.
+FLOW_NORMAL = 0
+FLOW_BREAK = 1
+FLOW_CONTINUE = 2
+FLOW_RETURN = 3
+FLOW_TAIL_CALL = 4  # return of a self-call; the caller rebinds params and loops
+
+# Arithmetic statement type -> (operator, failure message template for the target name).
+_ARITHMETIC_OPERATIONS: dict[type, tuple[Callable[[Any, Any], Any], str]] = {
+    AddStatement: (operator.add, "I couldn't add to '{}'"),
+    SubtractStatement: (operator.sub, "I couldn't subtract from '{}'"),
+    MultiplyStatement: (operator.mul, "I couldn't multiply '{}'"),
+    DivideStatement: (operator.truediv, "I couldn't divide '{}'"),
+}
+
+# Condition operator (as produced by the parser) -> comparison function.
+CONDITION_OPERATORS: dict[str, Callable[[Any, Any], Any]] = {
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "contains": operator.contains,
+    "not_contains": lambda left, right: right not in left,
+}
+
+# Leading tags that make a plain-text route response count as HTML.
+_HTML_MARKERS = ("<html", "<head", "<body", "<div", "<span", "<h1", "<h2", "<p", "<a", "<main", "<section")
+
+# Friendly key names accepted by key_down/key_pressed, mapped to Tk keysyms.
+_KEY_ALIASES = {
+    "esc": "escape",
+    "enter": "return",
+    "spacebar": "space",
+}
+
+# Bit positions for key state masks, shared read-only by every window. Common game
+# keys are pre-assigned; each PixelWindow gives any other keysym the next free bit
+# the first time it is pressed there.
+_KEY_BITS: Mapping[str, int] = MappingProxyType(
+    {
+        name: index
+        for index, name in enumerate(
+            ["left", "right", "up", "down", "space", "return", "escape", "shift_l", "shift_r", "tab"]
+            + [chr(code) for code in range(ord("a"), ord("z") + 1)]
+            + [str(digit) for digit in range(10)]
+        )
+    }
+)
+
+
+def _to_int(value: Any) -> int:
+    # The window builtins run per pixel; skip the int() call for values that are already ints.
+    return value if type(value) is int else int(value)
+
+
+def _to_str(value: Any) -> str:
+    return value if type(value) is str else str(value)
+
+
+# Tcl lambda behind PixelWindow.draw_pixels: fills one pixel_size square per (x, y)
+# pair inside Tcl, so a whole batch costs a single call from Python.
+_PUT_PIXELS_TCL = (
+    "{image data size coords} {foreach {x y} $coords "
+    "{$image put $data -to $x $y [expr {$x + $size}] [expr {$y + $size}]}}"
+)
+
+# Most cleared call-scope dicts kept for reuse; deeper recursion allocates fresh ones.
+_FRAME_POOL_LIMIT = 64
+
+# Most distinct expression strings (and normalized sources) kept compiled; the
+# oldest entry is dropped first so generated or user-typed expressions can't grow
+# the caches without bound.
+_EXPR_CACHE_LIMIT = 512
+
+# Redirects followed by _HttpConnectionPool, mirroring urllib's HTTPRedirectHandler.
+_REDIRECT_CODES = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 10
+
+# Upper bound on concurrent requests issued by fetch_many.
+_FETCH_MANY_WORKERS = 16
+
+# Expression sugar recognized by normalize_expression / _parse_call_expression.
+_FETCH_JSON_RE = re.compile(r"fetch\s+json\s+from\s+(.+)", re.IGNORECASE)
+_FETCH_RE = re.compile(r"fetch\s+from\s+(.+)", re.IGNORECASE)
+_HTML_PAGE_RE = re.compile(r"(?:html|web)\s+page\s+(.+)", re.IGNORECASE)
+_RANDOM_RE = re.compile(r"random(?:\s+number)?", re.IGNORECASE)
+_RANDOM_BETWEEN_RE = re.compile(r"random(?:\s+number)?\s+between\s+(.+?)\s+and\s+(.+)", re.IGNORECASE)
+_RANDOM_CHOICE_RE = re.compile(r"random\s+choice\s+from\s+(.+)", re.IGNORECASE)
+_TRUE_RE = re.compile(r"\btrue\b", re.IGNORECASE)
+_FALSE_RE = re.compile(r"\bfalse\b", re.IGNORECASE)
+_NOTHING_RE = re.compile(r"\bnothing\b", re.IGNORECASE)
+_CALL_EXPRESSION_RE = re.compile(r"(?:call|run)\s+([A-Za-z_][A-Za-z0-9_]*)(?:\s+with\s+(.+))?", re.IGNORECASE)
+
+
+def normalize_expression(expression: str) -> str:
+    """Rewrite E++ expression sugar and true/false/nothing into Python syntax."""
+
+    stripped = expression.strip()
+    # Every sugar form starts with one of these words, so plain expressions
+    # skip the regexes entirely.
+    head = stripped[:6].lower()
+    if head.startswith("fetch"):
+        fetch_json_match = _FETCH_JSON_RE.fullmatch(stripped)
+        if fetch_json_match:
+            expression = f"fetch_json_from_api({fetch_json_match.group(1).strip()})"
+        else:
+            fetch_match = _FETCH_RE.fullmatch(stripped)
+            if fetch_match:
+                expression = f"fetch_from_api({fetch_match.group(1).strip()})"
+    elif head.startswith(("html", "web")):
+        html_match = _HTML_PAGE_RE.fullmatch(stripped)
+        if html_match:
+            expression = f"make_html_page({html_match.group(1).strip()})"
+    elif head == "random":
+        if _RANDOM_RE.fullmatch(stripped):
+            expression = "random()"
+        else:
+            between_match = _RANDOM_BETWEEN_RE.fullmatch(stripped)
+            if between_match:
+                low = between_match.group(1).strip()
+                high = between_match.group(2).strip()
+                expression = f"random({low}, {high})"
+            else:
+                choice_match = _RANDOM_CHOICE_RE.fullmatch(stripped)
+                if choice_match:
+                    expression = f"choice({choice_match.group(1).strip()})"
+
+    # re's IGNORECASE also folds a few non-ASCII letters, so only ASCII text
+    # can be ruled out by a plain substring test.
+    lowered = expression.lower()
+    ascii_only = lowered.isascii()
+    if not ascii_only or "true" in lowered:
+        expression = _TRUE_RE.sub("True", expression)
+    if not ascii_only or "false" in lowered:
+        expression = _FALSE_RE.sub("False", expression)
+    if not ascii_only or "nothing" in lowered:
+        expression = _NOTHING_RE.sub("None", expression)
+    return expression
+
+
 class EppRuntimeError(Exception):
     """Human-friendly runtime errors."""
 
@@ -49,29 +212,42 @@ class EppRuntimeError(Exception):
         return f"Oops! On line {self.line}, {self.message}"
 
 
-class ReturnSignal(Exception):
-    """Internal control-flow signal for function returns."""
+class _LoopFlowSignal(Exception):
+    """Carries a 'stop' or 'skip' out of a function to the loop around its call.
+
+    Inside a body, flow codes do this job; a call can only hand back a value, so
+    the code travels as an exception to the caller's _execute_block.
+    """
 
-    def __init__(self, value: Any, line: int) -> None:
-        self.value = value
+    def __init__(self, flow: int, line: int) -> None:
+        self.flow = flow
         self.line = line
-        super().__init__("return")
+        super().__init__("break" if flow == FLOW_BREAK else "continue")
 
 
-class BreakSignal(Exception):
-    """Internal control-flow signal for loop breaks."""
+class _Namespace(dict):
+    """Merged scopes handed to eval(); builtins are looked up on first use.
 
-    def __init__(self, line: int) -> None:
-        self.line = line
-        super().__init__("break")
+    Only variables are copied in when the namespace is built. A builtin name is
+    fetched from the interpreter's builtin table the first time an expression
+    reads it and then kept, so later reads are plain dict hits.
+    """
 
+    __slots__ = ("_builtins",)
 
-class ContinueSignal(Exception):
-    """Internal control-flow signal for loop continues."""
+    def __init__(self, builtins: dict[str, Any]) -> None:
+        super().__init__()
+        self._builtins = builtins
 
-    def __init__(self, line: int) -> None:
-        self.line = line
-        super().__init__("continue")
+    def __missing__(self, name: str) -> Any:
+        value = self._builtins[name]  # KeyError lets eval report the missing name
+        self[name] = value
+        return value
+
+    def copy(self) -> _Namespace:
+        duplicate = _Namespace(self._builtins)
+        duplicate.update(self)
+        return duplicate
 
 
 @dataclass
@@ -80,6 +256,11 @@ class EppFunction:
     params: list[str]
     body: list[Statement]
     line: int
+    tail_self: bool = False  # some 'return call <self> with ...' can run as a loop
+    # Code for `lambda <params>: (<expr>)` when the whole body is one return; built
+    # on the first call, False once the body is known not to qualify.
+    fast_code: Any = None
+    proxy: Optional[Callable[..., Any]] = None  # callable handed to eval, made once
 
 
 class MiniFlaskApp:
@@ -149,7 +330,10 @@ class MiniFlaskApp:
                 outbound_headers = dict(headers)
                 outbound_headers.setdefault("Content-Length", str(len(body)))
                 for key, value in outbound_headers.items():
-                    self.send_header(str(key), str(value))
+                    self.send_header(
+                        key if isinstance(key, str) else str(key),
+                        value if isinstance(value, str) else str(value),
+                    )
                 self.end_headers()
                 self.wfile.write(body)
 
@@ -190,7 +374,7 @@ class MiniFlaskApp:
         body_bytes: bytes,
         headers: Any,
     ) -> tuple[int, dict[str, str], bytes]:
-        method = str(method).upper().strip()
+        method = method.upper().strip() if isinstance(method, str) else str(method).upper().strip()
         parsed = urlsplit(raw_path)
         path = parsed.path or "/"
         handler = self._routes.get(method, {}).get(path)
@@ -214,6 +398,8 @@ class MiniFlaskApp:
         if headers is None:
             return {}
         if isinstance(headers, dict):
+            if all(isinstance(key, str) and isinstance(value, str) for key, value in headers.items()):
+                return dict(headers)
             return {str(key): str(value) for key, value in headers.items()}
         try:
             return {str(key): str(value) for key, value in headers.items()}
@@ -251,7 +437,7 @@ class MiniFlaskApp:
             body_bytes = body_value
             headers.setdefault("Content-Type", "application/octet-stream")
         else:
-            body_text = str(body_value)
+            body_text = body_value if isinstance(body_value, str) else str(body_value)
             body_bytes = body_text.encode("utf-8")
             if MiniFlaskApp._looks_like_html(body_text):
                 headers.setdefault("Content-Type", "text/html; charset=utf-8")
@@ -267,8 +453,7 @@ class MiniFlaskApp:
             return True
         if not stripped.startswith("<"):
             return False
-        markers = ("<html", "<head", "<body", "<div", "<span", "<h1", "<h2", "<p", "<a", "<main", "<section")
-        return any(stripped.startswith(marker) for marker in markers)
+        return stripped.startswith(_HTML_MARKERS)
 
 
 class PixelWindow:
@@ -278,13 +463,17 @@ class PixelWindow:
         self.tk = None
         self.root = None
         self.canvas = None
+        self._image = None
         self.width = 0
         self.height = 0
         self.pixel_size = 1
         self.is_open = False
         self.background = "black"
-        self.keys_down: set[str] = set()
-        self.keys_pressed: set[str] = set()
+        # Key state as bitmasks over _KEY_BITS and _extra_key_bits: membership is a
+        # shift and a mask.
+        self.keys_down_mask = 0
+        self.keys_pressed_mask = 0
+        self._extra_key_bits: dict[str, int] = {}
 
     def open(
         self,
@@ -294,9 +483,9 @@ class PixelWindow:
         pixel_size: int = 10,
         background: str = "black",
     ) -> bool:
-        width = int(width)
-        height = int(height)
-        pixel_size = int(pixel_size)
+        width = _to_int(width)
+        height = _to_int(height)
+        pixel_size = _to_int(pixel_size)
         if width <= 0 or height <= 0:
             raise ValueError("Window size must be greater than zero.")
         if pixel_size <= 0:
@@ -321,11 +510,12 @@ class PixelWindow:
         self.width = width
         self.height = height
         self.pixel_size = pixel_size
-        self.background = str(background)
-        self.keys_down.clear()
-        self.keys_pressed.clear()
+        self.background = _to_str(background)
+        self.keys_down_mask = 0
+        self.keys_pressed_mask = 0
+        self._extra_key_bits.clear()
 
-        self.root.title(str(title))
+        self.root.title(_to_str(title))
         self.root.resizable(False, False)
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
@@ -338,6 +528,11 @@ class PixelWindow:
         )
         self.canvas.pack()
 
+        # Pixels and rectangles are painted into one image instead of one canvas
+        # item each, so a frame costs a single canvas item no matter how busy it is.
+        self._image = tk.PhotoImage(width=self.width * self.pixel_size, height=self.height * self.pixel_size)
+        self.canvas.create_image(0, 0, image=self._image, anchor="nw")
+
         # Bind key handlers broadly so games still receive input even if
         # focus lands on canvas/root differently across platforms.
         self.root.bind("<KeyPress>", self._on_key_press)
@@ -359,16 +554,18 @@ class PixelWindow:
                 pass
         self.root = None
         self.canvas = None
+        self._image = None
         self.is_open = False
-        self.keys_down.clear()
-        self.keys_pressed.clear()
+        self.keys_down_mask = 0
+        self.keys_pressed_mask = 0
+        self._extra_key_bits.clear()
 
     def poll(self) -> bool:
         """Advance one frame of window events."""
 
         if not self.is_open:
             return False
-        self.keys_pressed.clear()
+        self.keys_pressed_mask = 0
         self._focus_window()
         return self._pump_events()
 
@@ -380,76 +577,87 @@ class PixelWindow:
     def clear(self, color: str | None = None) -> None:
         self._ensure_open()
         if color is not None:
-            self.background = str(color)
+            self.background = _to_str(color)
             self.canvas.configure(bg=self.background)
-        self.canvas.delete("all")
+        # A blank image is transparent, so the canvas background shows through.
+        self._image.blank()
+        self.canvas.delete("text")
 
     def draw_pixel(self, x: int, y: int, color: str = "white") -> None:
         self._ensure_open()
-        x = int(x)
-        y = int(y)
+        x = _to_int(x)
+        y = _to_int(y)
         if x < 0 or y < 0 or x >= self.width or y >= self.height:
             return
         px = x * self.pixel_size
         py = y * self.pixel_size
-        self.canvas.create_rectangle(
-            px,
-            py,
-            px + self.pixel_size,
-            py + self.pixel_size,
-            outline=str(color),
-            fill=str(color),
-            width=0,
-        )
+        self._image.put(self._fill_data(color), to=(px, py, px + self.pixel_size, py + self.pixel_size))
+
+    def draw_pixels(self, xs: Any, ys: Any, color: str = "white") -> None:
+        self._ensure_open()
+        xs = [_to_int(x) for x in xs]
+        ys = [_to_int(y) for y in ys]
+        if len(xs) != len(ys):
+            raise ValueError("draw_pixels needs the same number of x and y values.")
+        width = self.width
+        height = self.height
+        size = self.pixel_size
+        coords: list[int] = []
+        for x, y in zip(xs, ys):
+            if 0 <= x < width and 0 <= y < height:
+                coords.append(x * size)
+                coords.append(y * size)
+        if coords:
+            self._image.tk.call("apply", _PUT_PIXELS_TCL, self._image.name, self._fill_data(color), size, coords)
 
     def draw_rect(self, x: int, y: int, w: int, h: int, color: str = "white") -> None:
         self._ensure_open()
-        x = int(x)
-        y = int(y)
-        w = int(w)
-        h = int(h)
+        x = _to_int(x)
+        y = _to_int(y)
+        w = _to_int(w)
+        h = _to_int(h)
         if w <= 0 or h <= 0:
             return
-        px = x * self.pixel_size
-        py = y * self.pixel_size
-        self.canvas.create_rectangle(
-            px,
-            py,
-            px + (w * self.pixel_size),
-            py + (h * self.pixel_size),
-            outline=str(color),
-            fill=str(color),
-            width=0,
-        )
+        # Clip to the image; PhotoImage.put rejects coordinates outside it.
+        left = max(x, 0) * self.pixel_size
+        top = max(y, 0) * self.pixel_size
+        right = min(x + w, self.width) * self.pixel_size
+        bottom = min(y + h, self.height) * self.pixel_size
+        if left >= right or top >= bottom:
+            return
+        self._image.put(self._fill_data(color), to=(left, top, right, bottom))
 
     def draw_text(self, x: int, y: int, text: Any, color: str = "white", size: int = 12) -> None:
         self._ensure_open()
-        x = int(x)
-        y = int(y)
-        size = max(int(size), 6)
+        x = _to_int(x)
+        y = _to_int(y)
+        size = max(_to_int(size), 6)
         px = x * self.pixel_size
         py = y * self.pixel_size
         self.canvas.create_text(
             px,
             py,
-            text=str(text),
-            fill=str(color),
+            text=_to_str(text),
+            fill=_to_str(color),
             font=("Courier New", size, "bold"),
             anchor="nw",
+            tags="text",
         )
 
     def key_down(self, key_name: str) -> bool:
-        return self._normalize_key(str(key_name)) in self.keys_down
+        bit = self._key_bit(self._normalize_key(_to_str(key_name)))
+        return bit is not None and bool((self.keys_down_mask >> bit) & 1)
 
     def key_pressed(self, key_name: str) -> bool:
-        return self._normalize_key(str(key_name)) in self.keys_pressed
+        bit = self._key_bit(self._normalize_key(_to_str(key_name)))
+        return bit is not None and bool((self.keys_pressed_mask >> bit) & 1)
 
     def set_title(self, title: Any) -> None:
         self._ensure_open()
-        self.root.title(str(title))
+        self.root.title(_to_str(title))
 
     def _ensure_open(self) -> None:
-        if not self.is_open or self.root is None or self.canvas is None:
+        if not self.is_open or self.root is None or self.canvas is None or self._image is None:
             raise RuntimeError("No window is open. Call 'call open_window with ...' first.")
 
     def _pump_events(self) -> bool:
@@ -476,28 +684,198 @@ class PixelWindow:
         except Exception:
             pass
 
+    @staticmethod
+    def _fill_data(color: Any) -> tuple[tuple[str]]:
+        # One row holding one pixel; Tk tiles it across the "to" region. A nested
+        # tuple keeps color names with spaces (like "light blue") as one pixel.
+        return ((_to_str(color),),)
+
     @staticmethod
     def _normalize_key(key_name: str) -> str:
         key = key_name.lower()
-        aliases = {
-            "esc": "escape",
-            "enter": "return",
-            "spacebar": "space",
-        }
-        return aliases.get(key, key)
+        return _KEY_ALIASES.get(key, key)
+
+    def _key_bit(self, key: str) -> Optional[int]:
+        bit = _KEY_BITS.get(key)
+        return bit if bit is not None else self._extra_key_bits.get(key)
 
     def _on_key_press(self, event: Any) -> None:
         key = self._normalize_key(str(getattr(event, "keysym", "")))
         if not key:
             return
-        self.keys_down.add(key)
-        self.keys_pressed.add(key)
+        bit = self._key_bit(key)
+        if bit is None:
+            bit = len(_KEY_BITS) + len(self._extra_key_bits)
+            self._extra_key_bits[key] = bit
+        self.keys_down_mask |= 1 << bit
+        self.keys_pressed_mask |= 1 << bit
 
     def _on_key_release(self, event: Any) -> None:
         key = self._normalize_key(str(getattr(event, "keysym", "")))
         if not key:
             return
-        self.keys_down.discard(key)
+        bit = self._key_bit(key)
+        if bit is not None:
+            self.keys_down_mask &= ~(1 << bit)
+
+
+class _HttpConnectionPool:
+    """Keep-alive HTTP(S) connections shared by the fetch builtins.
+
+    Idle connections are kept per (scheme, host, port) and handed to one caller
+    at a time, so a script fetching the same API repeatedly pays for the TCP/TLS
+    handshake once. Safe to share between threads.
+    """
+
+    def __init__(self, max_idle_per_host: int = 4) -> None:
+        self._idle: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._max_idle_per_host = max_idle_per_host
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    @staticmethod
+    def handles(url: str) -> bool:
+        """True for plain http(s) URLs; proxies and credentials are left to urllib."""
+
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or parts.username is not None:
+            return False
+        return scheme not in urllib.request.getproxies()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        headers: dict[str, str],
+        timeout: float,
+    ) -> tuple[int, bytes]:
+        """Send a request, following redirects like urlopen; return (status, body)."""
+
+        headers = dict(headers)
+        lowered = {key.lower() for key in headers}
+        if "user-agent" not in lowered:
+            headers["User-Agent"] = f"Python-urllib/{urllib.request.__version__}"
+        if body is not None and "content-type" not in lowered:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        redirects = 0
+        while True:
+            status, location, data = self._send(method, url, body, headers, timeout)
+            if status not in _REDIRECT_CODES or not location or redirects >= _MAX_REDIRECTS:
+                return status, data
+            if not (method in ("GET", "HEAD") or (status in (301, 302, 303) and method == "POST")):
+                return status, data
+            url = urljoin(url, location)
+            if not self.handles(url):
+                return status, data
+            if body is not None:
+                body = None
+                headers = {
+                    key: value
+                    for key, value in headers.items()
+                    if key.lower() not in ("content-length", "content-type")
+                }
+            method = "HEAD" if method == "HEAD" else "GET"
+            redirects += 1
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        headers: dict[str, str],
+        timeout: float,
+    ) -> tuple[int, Optional[str], bytes]:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = parts.hostname or ""
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        while True:
+            connection = self._checkout(key)
+            reused = connection is not None
+            if connection is None:
+                connection = self._connect(scheme, host, port, timeout)
+            else:
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+            try:
+                connection.request(method, target, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if reused:
+                    # The server dropped an idle keep-alive socket; try a fresh one.
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            break
+
+        location = response.getheader("Location")
+        if response.will_close:
+            connection.close()
+        else:
+            self._checkin(key, connection)
+        return response.status, location, data
+
+    def close(self) -> None:
+        """Close every idle connection."""
+
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def _connect(self, scheme: str, host: str, port: int, timeout: float) -> http.client.HTTPConnection:
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _checkout(self, key: tuple[str, str, int]) -> Optional[http.client.HTTPConnection]:
+        with self._lock:
+            idle = self._idle.get(key)
+            return idle.pop() if idle else None
+
+    def _checkin(self, key: tuple[str, str, int], connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self._max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+
+# Builtins that don't depend on the interpreter, built once and copied into each
+# instance's map by _create_builtins.
+_STATIC_BUILTINS: dict[str, Any] = {
+    "len": len,
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "range": range,
+    "list": list,
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "round": round,
+    "sorted": sorted,
+    "sleep": time.sleep,
+}
 
 
 class EppInterpreter:
@@ -516,234 +894,359 @@ class EppInterpreter:
         self.max_loop_iterations = max_loop_iterations
         self.loop_iterations = 0
         self._active_expression_line = 1
+        self._expr_cache: dict[str, tuple[Any, ...]] = {}
+        self._code_cache: dict[str, Optional[CodeType]] = {}
+        self._return_value: Any = None
+        self._frame_pool: list[dict[str, Any]] = []
+        self._active_function: Optional[EppFunction] = None
+        self._tail_args: list[Any] = []
+        self._rng = random.Random()  # per interpreter, so set_seed can't affect other code
+        self._builtins = self._create_builtins()
+        self._http = _HttpConnectionPool()
+        self._fetch_executor: Optional[ThreadPoolExecutor] = None
+        self._flow_line = 1
+        # _build_namespace reuses its last result until a scope is pushed or popped
+        # (or a run starts); variable writes go through _assign to keep it current.
+        self._scope_generation = 0
+        self._namespace_generation = -1
+        self._namespace_cache: dict[str, Any] = {}
+        self._outer_writes = 0  # writes to a scope other than the innermost one
         self.pixel_window = PixelWindow()
+        # Exact-type lookup: one dict probe per statement instead of an isinstance chain.
+        self._dispatch: dict[type, Callable[[Any], Optional[int]]] = {
+            SetStatement: self._exec_set,
+            SayStatement: self._exec_say,
+            AskStatement: self._exec_ask,
+            CreateListStatement: self._exec_create_list,
+            AddStatement: self._apply_arithmetic,
+            SubtractStatement: self._apply_arithmetic,
+            MultiplyStatement: self._apply_arithmetic,
+            DivideStatement: self._apply_arithmetic,
+            RemoveStatement: self._exec_remove,
+            IfStatement: self._run_if_statement,
+            RepeatTimesStatement: self._exec_repeat_times,
+            RepeatWhileStatement: self._exec_repeat_while,
+            ForEachStatement: self._exec_for_each,
+            FunctionDefStatement: self._exec_function_def,
+            CallStatement: self._exec_call,
+            ReturnStatement: self._exec_return,
+            BreakStatement: self._exec_break,
+            ContinueStatement: self._exec_continue,
+        }
 
     def execute(self, program: Program) -> None:
         self.loop_iterations = 0
+        # Callers (the REPL, tests) may have edited global_scope between runs.
+        self._scope_generation += 1
+        flow = self._execute_block(program.statements)
+        if flow == FLOW_RETURN:
+            self._return_value = None
+            raise EppRuntimeError(self._flow_line, "I found 'return' outside of a function.")
+        self._raise_stray_loop_flow(flow)
+
+    def _execute_block(self, statements: list[Statement]) -> int:
+        # Dispatch inline so each statement costs one dict probe and one call.
+        # A non-zero flow code (break/continue/return) stops the block early.
+        dispatch = self._dispatch
         try:
-            self._execute_block(program.statements)
-        except ReturnSignal as return_signal:
-            raise EppRuntimeError(return_signal.line, "I found 'return' outside of a function.") from None
-        except BreakSignal as break_signal:
-            raise EppRuntimeError(break_signal.line, "I found 'stop' outside of a loop.") from None
-        except ContinueSignal as continue_signal:
-            raise EppRuntimeError(continue_signal.line, "I found 'skip' outside of a loop.") from None
-
-    def _execute_block(self, statements: list[Statement]) -> None:
-        for statement in statements:
-            self._execute_statement(statement)
+            for statement in statements:
+                handler = dispatch.get(type(statement))
+                if handler is None:
+                    self._raise_unsupported_statement(statement)
+                flow = handler(statement)
+                if flow:
+                    return flow
+        except _LoopFlowSignal as signal:
+            # A function called by this statement ran 'stop' or 'skip' outside any
+            # loop of its own; it applies to the loop running this block.
+            self._flow_line = signal.line
+            return signal.flow
+        return FLOW_NORMAL
 
-    def _execute_statement(self, statement: Statement) -> None:
-        if isinstance(statement, SetStatement):
-            value = self._evaluate_expression(statement.expression, statement.line)
-            self._current_scope()[statement.name] = value
-            return
+    @staticmethod
+    def _raise_unsupported_statement(statement: Statement) -> NoReturn:
+        # Every statement type the parser produces is in _dispatch; anything else
+        # is a bug in whatever built the Program.
+        raise EppRuntimeError(
+            getattr(statement, "line", 1),
+            f"Internal error: unsupported statement type {type(statement).__name__}.",
+        )
 
-        if isinstance(statement, SayStatement):
-            value = self._evaluate_expression(statement.expression, statement.line)
-            self.output_fn(value)
-            return
+    def _raise_stray_loop_flow(self, flow: int) -> None:
+        if flow == FLOW_BREAK:
+            raise EppRuntimeError(self._flow_line, "I found 'stop' outside of a loop.")
+        if flow == FLOW_CONTINUE:
+            raise EppRuntimeError(self._flow_line, "I found 'skip' outside of a loop.")
+
+    def _exec_set(self, statement: SetStatement) -> None:
+        value = self._evaluate_expression(statement.expression, statement.line)
+        self._assign(self.scopes[-1], statement.name, value)
+
+    def _exec_say(self, statement: SayStatement) -> None:
+        value = self._evaluate_expression(statement.expression, statement.line)
+        self.output_fn(value)
+
+    def _exec_ask(self, statement: AskStatement) -> None:
+        prompt = self._evaluate_expression(statement.prompt_expression, statement.line)
+        answer = self.input_fn(str(prompt))
+        self._assign(self.scopes[-1], statement.target_name, answer)
+
+    def _exec_create_list(self, statement: CreateListStatement) -> None:
+        self._assign(self.scopes[-1], statement.name, [])
+
+    def _exec_remove(self, statement: RemoveStatement) -> None:
+        scope = self._scope_with_name(statement.list_name, statement.line)
+        list_value = scope[statement.list_name]
+        if not isinstance(list_value, list):
+            raise EppRuntimeError(statement.line, f"'{statement.list_name}' is not a list.")
+        item = self._evaluate_expression(statement.value_expression, statement.line)
+        try:
+            list_value.remove(item)
+        except ValueError:
+            raise EppRuntimeError(
+                statement.line,
+                f"I couldn't remove {item!r} because it is not in '{statement.list_name}'.",
+            ) from None
 
-        if isinstance(statement, AskStatement):
-            prompt = self._evaluate_expression(statement.prompt_expression, statement.line)
-            answer = self.input_fn(str(prompt))
-            self._current_scope()[statement.target_name] = answer
-            return
+    def _exec_repeat_times(self, statement: RepeatTimesStatement) -> Optional[int]:
+        count_value = self._evaluate_expression(statement.count_expression, statement.line)
+        if not isinstance(count_value, int):
+            if isinstance(count_value, (float, bool)):
+                count_value = int(count_value)
+            else:
+                raise EppRuntimeError(
+                    statement.line,
+                    "The 'repeat ... times' value must be a number.",
+                )
+        if count_value < 0:
+            raise EppRuntimeError(statement.line, "The repeat count must be zero or greater.")
+        if len(statement.body) == 1 and self._run_fused_repeat(statement, count_value):
+            return None
+        limit = self.max_loop_iterations
+        for _ in range(count_value):
+            self.loop_iterations += 1
+            if self.loop_iterations > limit:
+                self._raise_runaway_loop(statement.line)
+            flow = self._execute_block(statement.body)
+            if flow == FLOW_BREAK:
+                break
+            if flow >= FLOW_RETURN:
+                return flow
+        return None
 
-        if isinstance(statement, CreateListStatement):
-            self._current_scope()[statement.name] = []
-            return
+    def _run_fused_repeat(self, statement: RepeatTimesStatement, count: int) -> bool:
+        """Collapse `repeat N times` around one integer add/subtract/multiply by a literal.
 
-        if isinstance(statement, AddStatement):
-            self._apply_add(statement)
-            return
+        Returns False (and does nothing) when the pattern or the runtime types do not
+        match, or when the loop would hit the safety limit, so the normal loop runs.
+        """
 
-        if isinstance(statement, SubtractStatement):
-            value = self._evaluate_expression(statement.value_expression, statement.line)
-            scope = self._scope_with_name(statement.target_name, statement.line)
-            target = scope[statement.target_name]
-            try:
-                scope[statement.target_name] = target - value
-            except Exception as exc:
-                raise EppRuntimeError(
-                    statement.line,
-                    f"I couldn't subtract from '{statement.target_name}': {exc}",
-                ) from None
-            return
+        step = statement.body[0]
+        kind = type(step)
+        if kind not in (AddStatement, SubtractStatement, MultiplyStatement):
+            return False
+        literal = step.value_expression
+        if count == 0 or not (literal.isascii() and literal.isdigit()):
+            return False
+        if self.loop_iterations + count > self.max_loop_iterations:
+            return False
 
-        if isinstance(statement, MultiplyStatement):
-            value = self._evaluate_expression(statement.value_expression, statement.line)
-            scope = self._scope_with_name(statement.target_name, statement.line)
-            target = scope[statement.target_name]
-            try:
-                scope[statement.target_name] = target * value
-            except Exception as exc:
-                raise EppRuntimeError(
-                    statement.line,
-                    f"I couldn't multiply '{statement.target_name}': {exc}",
-                ) from None
-            return
+        scope = self._scope_with_name(step.target_name, step.line)
+        target = scope[step.target_name]
+        if type(target) is not int:
+            return False
 
-        if isinstance(statement, DivideStatement):
-            value = self._evaluate_expression(statement.value_expression, statement.line)
-            scope = self._scope_with_name(statement.target_name, statement.line)
-            target = scope[statement.target_name]
-            try:
-                scope[statement.target_name] = target / value
-            except ZeroDivisionError:
-                raise EppRuntimeError(statement.line, "Division by zero is not allowed.") from None
-            except Exception as exc:
-                raise EppRuntimeError(
-                    statement.line,
-                    f"I couldn't divide '{statement.target_name}': {exc}",
-                ) from None
-            return
+        delta = int(literal)
+        if kind is AddStatement:
+            self._assign(scope, step.target_name, target + delta * count)
+        elif kind is SubtractStatement:
+            self._assign(scope, step.target_name, target - delta * count)
+        else:
+            self._assign(scope, step.target_name, target * delta**count)
+        self.loop_iterations += count
+        return True
 
-        if isinstance(statement, RemoveStatement):
-            scope = self._scope_with_name(statement.list_name, statement.line)
-            list_value = scope[statement.list_name]
-            if not isinstance(list_value, list):
-                raise EppRuntimeError(statement.line, f"'{statement.list_name}' is not a list.")
-            item = self._evaluate_expression(statement.value_expression, statement.line)
-            try:
-                list_value.remove(item)
-            except ValueError:
-                raise EppRuntimeError(
-                    statement.line,
-                    f"I couldn't remove {item!r} because it is not in '{statement.list_name}'.",
-                ) from None
-            return
+    def _exec_repeat_while(self, statement: RepeatWhileStatement) -> Optional[int]:
+        limit = self.max_loop_iterations
+        while self._evaluate_condition(statement.condition):
+            self.loop_iterations += 1
+            if self.loop_iterations > limit:
+                self._raise_runaway_loop(statement.line)
+            flow = self._execute_block(statement.body)
+            if flow == FLOW_BREAK:
+                break
+            if flow >= FLOW_RETURN:
+                return flow
+        return None
 
-        if isinstance(statement, IfStatement):
-            self._run_if_statement(statement)
-            return
+    def _exec_for_each(self, statement: ForEachStatement) -> Optional[int]:
+        iterable = self._evaluate_expression(statement.iterable_expression, statement.line)
+        try:
+            iterator = iter(iterable)
+        except TypeError:
+            raise EppRuntimeError(statement.line, "I can only loop over iterable values.") from None
 
-        if isinstance(statement, RepeatTimesStatement):
-            count_value = self._evaluate_expression(statement.count_expression, statement.line)
-            if not isinstance(count_value, int):
-                if isinstance(count_value, (float, bool)):
-                    count_value = int(count_value)
-                else:
-                    raise EppRuntimeError(
-                        statement.line,
-                        "The 'repeat ... times' value must be a number.",
-                    )
-            if count_value < 0:
-                raise EppRuntimeError(statement.line, "The repeat count must be zero or greater.")
-            for _ in range(count_value):
-                self._bump_loop_counter(statement.line)
-                try:
-                    self._execute_block(statement.body)
-                except ContinueSignal:
-                    continue
-                except BreakSignal:
-                    break
-            return
+        if type(iterable) is list and len(statement.body) == 1 and self._run_fused_sum(statement, iterable):
+            return None
 
-        if isinstance(statement, RepeatWhileStatement):
-            while self._evaluate_condition(statement.condition):
-                self._bump_loop_counter(statement.line)
-                try:
-                    self._execute_block(statement.body)
-                except ContinueSignal:
-                    continue
-                except BreakSignal:
-                    break
-            return
+        limit = self.max_loop_iterations
+        item_name = statement.item_name
+        for item in iterator:
+            self.loop_iterations += 1
+            if self.loop_iterations > limit:
+                self._raise_runaway_loop(statement.line)
+            self._assign(self.scopes[-1], item_name, item)
+            flow = self._execute_block(statement.body)
+            if flow == FLOW_BREAK:
+                break
+            if flow >= FLOW_RETURN:
+                return flow
+        return None
 
-        if isinstance(statement, ForEachStatement):
-            iterable = self._evaluate_expression(statement.iterable_expression, statement.line)
-            try:
-                iterator = iter(iterable)
-            except TypeError:
-                raise EppRuntimeError(statement.line, "I can only loop over iterable values.") from None
+    def _run_fused_sum(self, statement: ForEachStatement, items: list[Any]) -> bool:
+        """Collapse `for each v in nums` + `add v to total` over an all-int list into sum().
 
-            for item in iterator:
-                self._bump_loop_counter(statement.line)
-                self._current_scope()[statement.item_name] = item
-                try:
-                    self._execute_block(statement.body)
-                except ContinueSignal:
-                    continue
-                except BreakSignal:
-                    break
-            return
+        Returns False (and does nothing) when the shape or runtime types do not match,
+        or when the loop would hit the safety limit, so the normal loop runs.
+        """
 
-        if isinstance(statement, FunctionDefStatement):
-            self._current_scope()[statement.name] = EppFunction(
-                name=statement.name,
-                params=statement.params,
-                body=statement.body,
-                line=statement.line,
-            )
-            return
+        step = statement.body[0]
+        if type(step) is not AddStatement or step.value_expression.strip() != statement.item_name:
+            return False
+        if not items or step.target_name == statement.item_name:
+            return False
+        if self.loop_iterations + len(items) > self.max_loop_iterations:
+            return False
+        scope = self._find_scope(step.target_name)
+        if scope is None or type(scope[step.target_name]) is not int:
+            return False
+        if not all(type(item) is int for item in items):
+            return False
 
-        if isinstance(statement, CallStatement):
-            arguments = [self._evaluate_expression(arg, statement.line) for arg in statement.arguments]
-            self._call_function(statement.name, arguments, statement.line)
-            return
+        self._assign(self.scopes[-1], statement.item_name, items[-1])
+        self._assign(scope, step.target_name, scope[step.target_name] + sum(items))
+        self.loop_iterations += len(items)
+        return True
+
+    def _exec_function_def(self, statement: FunctionDefStatement) -> None:
+        function = EppFunction(
+            name=statement.name,
+            params=statement.params,
+            body=statement.body,
+            line=statement.line,
+            tail_self=self._has_self_tail_call(statement.name, statement.body),
+        )
+        self._assign(self.scopes[-1], statement.name, function)
 
-        if isinstance(statement, ReturnStatement):
-            value = self._evaluate_expression(statement.expression, statement.line) if statement.expression else None
-            raise ReturnSignal(value=value, line=statement.line)
+    def _has_self_tail_call(self, name: str, statements: list[Statement]) -> bool:
+        # A return's value is the last thing a call computes, so any
+        # 'return call <name> with ...' is in tail position wherever it appears.
+        for statement in statements:
+            if isinstance(statement, ReturnStatement) and statement.expression:
+                plan = self._expression_plan(statement.expression)
+                if plan[0] == _PLAN_CALL and plan[1] == name:
+                    return True
+            elif isinstance(statement, IfStatement):
+                branches = [statement.body, *(branch.body for branch in statement.elif_branches)]
+                if statement.else_body is not None:
+                    branches.append(statement.else_body)
+                if any(self._has_self_tail_call(name, body) for body in branches):
+                    return True
+            elif isinstance(statement, (RepeatTimesStatement, RepeatWhileStatement, ForEachStatement)):
+                if self._has_self_tail_call(name, statement.body):
+                    return True
+        return False
+
+    def _exec_call(self, statement: CallStatement) -> None:
+        arguments = [self._evaluate_expression(arg, statement.line) for arg in statement.arguments]
+        self._call_function(statement.name, arguments, statement.line)
+
+    def _exec_return(self, statement: ReturnStatement) -> int:
+        function = self._active_function
+        if function is not None and function.tail_self and statement.expression:
+            tail_args = self._tail_call_arguments(function, statement)
+            if tail_args is not None:
+                self._tail_args = tail_args
+                self._flow_line = statement.line
+                return FLOW_TAIL_CALL
+
+        self._return_value = (
+            self._evaluate_expression(statement.expression, statement.line) if statement.expression else None
+        )
+        self._flow_line = statement.line
+        return FLOW_RETURN
 
-        if isinstance(statement, BreakStatement):
-            raise BreakSignal(statement.line)
+    def _tail_call_arguments(self, function: EppFunction, statement: ReturnStatement) -> Optional[list[Any]]:
+        """Evaluate the arguments of a 'return call <self> with ...', or None if it is not one."""
+
+        plan = self._expression_plan(statement.expression or "")
+        if plan[0] != _PLAN_CALL or plan[1] != function.name:
+            return None
+        scope = self._find_scope(function.name)
+        if scope is None or scope[function.name] is not function:
+            return None
+        raw_arguments = plan[2]
+        if len(raw_arguments) != len(function.params):
+            return None
+        return [self._evaluate_expression(argument, statement.line) for argument in raw_arguments]
 
-        if isinstance(statement, ContinueStatement):
-            raise ContinueSignal(statement.line)
+    def _exec_break(self, statement: BreakStatement) -> int:
+        self._flow_line = statement.line
+        return FLOW_BREAK
 
-        raise EppRuntimeError(1, f"Internal error: unsupported statement type {type(statement).__name__}.")
+    def _exec_continue(self, statement: ContinueStatement) -> int:
+        self._flow_line = statement.line
+        return FLOW_CONTINUE
 
-    def _apply_add(self, statement: AddStatement) -> None:
+    def _apply_arithmetic(self, statement: AddStatement | SubtractStatement | MultiplyStatement | DivideStatement) -> None:
         value = self._evaluate_expression(statement.value_expression, statement.line)
-        scope = self._scope_with_name(statement.target_name, statement.line)
-        target = scope[statement.target_name]
+        name = statement.target_name
+        scope = self._scope_with_name(name, statement.line)
+        target = scope[name]
+        kind = type(statement)
 
-        if isinstance(target, list):
+        if kind is AddStatement and isinstance(target, list):
             target.append(value)
             return
 
+        operation, failure = _ARITHMETIC_OPERATIONS[kind]
         try:
-            scope[statement.target_name] = target + value
+            result = operation(target, value)
         except Exception as exc:
-            raise EppRuntimeError(
-                statement.line,
-                f"I couldn't add to '{statement.target_name}': {exc}",
-            ) from None
+            if kind is DivideStatement and isinstance(exc, ZeroDivisionError):
+                raise EppRuntimeError(statement.line, "Division by zero is not allowed.") from None
+            raise EppRuntimeError(statement.line, f"{failure.format(name)}: {exc}") from None
+        self._assign(scope, name, result)
 
-    def _run_if_statement(self, statement: IfStatement) -> None:
+    def _run_if_statement(self, statement: IfStatement) -> int:
         if self._evaluate_condition(statement.condition):
-            self._execute_block(statement.body)
-            return
+            return self._execute_block(statement.body)
 
         for branch in statement.elif_branches:
             if self._evaluate_condition(branch.condition):
-                self._execute_block(branch.body)
-                return
+                return self._execute_block(branch.body)
 
         if statement.else_body is not None:
-            self._execute_block(statement.else_body)
+            return self._execute_block(statement.else_body)
+        return FLOW_NORMAL
 
-    def _bump_loop_counter(self, line: int) -> None:
-        self.loop_iterations += 1
-        if self.loop_iterations > self.max_loop_iterations:
-            raise EppRuntimeError(
-                line,
-                "This loop seems to be running forever. Consider adding a stop condition.",
-            )
+    @staticmethod
+    def _raise_runaway_loop(line: int) -> None:
+        raise EppRuntimeError(
+            line,
+            "This loop seems to be running forever. Consider adding a stop condition.",
+        )
 
     def _call_function(self, name: str, args: list[Any], line: int) -> Any:
         value: Any | None = None
         found = False
-        for scope in reversed(self.scopes):
-            if name in scope:
-                value = scope[name]
-                found = True
-                break
+        scope = self._find_scope(name)
+        if scope is not None:
+            value = scope[name]
+            found = True
 
         if not found:
-            builtins = self._base_namespace()
+            builtins = self._builtins
             if name in builtins:
                 value = builtins[name]
                 found = True
@@ -764,117 +1267,320 @@ class EppInterpreter:
         except Exception as exc:
             raise EppRuntimeError(line, f"Function '{name}' failed: {exc}") from None
 
-    def _call_user_function(self, function: EppFunction, args: list[Any], line: int) -> Any:
+    def _call_user_function(self, function: EppFunction, args: Sequence[Any], line: int) -> Any:
         if len(args) != len(function.params):
             raise EppRuntimeError(
                 line,
                 f"Function '{function.name}' expects {len(function.params)} argument(s), but got {len(args)}.",
             )
 
-        local_scope = dict(zip(function.params, args))
+        fast_code = function.fast_code
+        if fast_code is None:
+            fast_code = function.fast_code = self._compile_fast_body(function)
+        if fast_code is not False:
+            return self._call_fast_function(function, fast_code, args)
+
+        # Reuse cleared scope dicts from earlier calls instead of allocating one per call.
+        frame_pool = self._frame_pool
+        local_scope = frame_pool.pop() if frame_pool else {}
+        for param, arg in zip(function.params, args):
+            local_scope[param] = arg
         self.scopes.append(local_scope)
+        self._scope_generation += 1
+        previous_function = self._active_function
+        self._active_function = function
         try:
-            self._execute_block(function.body)
-        except ReturnSignal as signal:
-            return signal.value
+            flow = self._execute_block(function.body)
+            tail_calls = 0
+            while flow == FLOW_TAIL_CALL:
+                # Self tail call: rebind the parameters in this frame and run the body
+                # again. Other locals stay visible, just as they would be from the
+                # caller frames of a real recursive call. Recursion is not a loop, so
+                # it gets its own cap instead of spending the loop budget.
+                tail_calls += 1
+                if tail_calls > self.max_loop_iterations:
+                    raise EppRuntimeError(
+                        self._flow_line,
+                        f"'{function.name}' keeps calling itself and never finishes. "
+                        "Consider adding a stop condition.",
+                    )
+                for param, arg in zip(function.params, self._tail_args):
+                    local_scope[param] = arg
+                self._scope_generation += 1
+                flow = self._execute_block(function.body)
         finally:
+            self._active_function = previous_function
             self.scopes.pop()
+            self._scope_generation += 1
+            local_scope.clear()
+            if len(frame_pool) < _FRAME_POOL_LIMIT:
+                frame_pool.append(local_scope)
+
+        if flow == FLOW_RETURN:
+            value = self._return_value
+            self._return_value = None
+            return value
+        if flow:
+            raise _LoopFlowSignal(flow, self._flow_line)
         return None
 
+    def _compile_fast_body(self, function: EppFunction) -> Any:
+        """Compile a body that is only `return <expression>` into a Python function body.
+
+        Returns False for any other body, for E++ 'call ... with' returns, and for
+        expressions that need a nested scope (comprehensions, lambdas), which eval
+        resolves differently; those functions are interpreted as usual.
+        """
+
+        body = function.body
+        if function.tail_self or len(body) != 1 or type(body[0]) is not ReturnStatement or not body[0].expression:
+            return False
+        plan = self._expression_plan(body[0].expression)
+        if plan[0] == _PLAN_NAME:
+            normalized = plan[1]
+        elif plan[0] == _PLAN_CONST or (plan[0] == _PLAN_EVAL and plan[1] is not None):
+            normalized = plan[2]
+        else:
+            return False
+        outer = self._compile_expression(f"lambda {', '.join(function.params)}: ({normalized})")
+        if outer is None:
+            return False
+        code = next(const for const in outer.co_consts if isinstance(const, CodeType))
+        if any(isinstance(const, CodeType) for const in code.co_consts):
+            return False
+        return code
+
+    def _call_fast_function(self, function: EppFunction, code: CodeType, args: Sequence[Any]) -> Any:
+        """Run a compiled single-return body with the caller's namespace as globals.
+
+        Parameters become Python locals and every other name resolves through the
+        caller's scopes, exactly as the interpreted return would see them.
+        """
+
+        statement = function.body[0]
+        namespace = self._build_namespace()
+        outer_writes = self._outer_writes
+        frame_pool = self._frame_pool
+        local_scope = frame_pool.pop() if frame_pool else {}
+        for param, arg in zip(function.params, args):
+            local_scope[param] = arg
+        # Still pushed, so functions called from the expression see the parameters.
+        self.scopes.append(local_scope)
+        self._scope_generation += 1
+        previous_line = self._active_expression_line
+        self._active_expression_line = statement.line
+        try:
+            return FunctionType(code, namespace)(*args)
+        except Exception as exc:
+            raise self._expression_error(exc, statement.expression, statement.line) from None
+        finally:
+            self._active_expression_line = previous_line
+            self.scopes.pop()
+            self._scope_generation += 1
+            local_scope.clear()
+            if len(frame_pool) < _FRAME_POOL_LIMIT:
+                frame_pool.append(local_scope)
+            if self._outer_writes == outer_writes:
+                # Nothing touched the surviving scopes, so the caller's namespace is exact.
+                self._namespace_cache = namespace
+                self._namespace_generation = self._scope_generation
+
     def _evaluate_condition(self, condition: Condition) -> bool:
         if condition.operator == "truthy":
             return bool(self._evaluate_expression(condition.left_expression, condition.line))
 
         left = self._evaluate_expression(condition.left_expression, condition.line)
         right = self._evaluate_expression(condition.right_expression or "", condition.line)
+        compare = CONDITION_OPERATORS.get(condition.operator)
+        if compare is None:
+            raise EppRuntimeError(condition.line, f"Unknown condition operator '{condition.operator}'.")
         try:
-            if condition.operator == ">":
-                return left > right
-            if condition.operator == "<":
-                return left < right
-            if condition.operator == ">=":
-                return left >= right
-            if condition.operator == "<=":
-                return left <= right
-            if condition.operator == "==":
-                return left == right
-            if condition.operator == "!=":
-                return left != right
-            if condition.operator == "contains":
-                return right in left
-            if condition.operator == "not_contains":
-                return right not in left
+            return compare(left, right)
         except Exception as exc:
             raise EppRuntimeError(condition.line, f"I couldn't evaluate this condition: {exc}") from None
 
-        raise EppRuntimeError(condition.line, f"Unknown condition operator '{condition.operator}'.")
-
     def _evaluate_expression(self, expression: str, line: int) -> Any:
-        normalized = self._normalize_expression(expression)
-        call_expression = self._parse_call_expression(normalized)
-        if call_expression:
-            function_name, raw_arguments = call_expression
-            arguments = [self._evaluate_expression(argument, line) for argument in self._split_arguments(raw_arguments)]
-            return self._call_function(function_name, arguments, line)
+        plan = self._expression_plan(expression)
+        kind = plan[0]
+        if kind == _PLAN_CALL:
+            arguments = [self._evaluate_expression(argument, line) for argument in plan[2]]
+            return self._call_function(plan[1], arguments, line)
+        if kind == _PLAN_NAME:
+            return self._lookup_name(plan[1], line)
+        if kind == _PLAN_CONST:
+            return plan[1]
 
         namespace = self._build_namespace()
+        if plan[3]:
+            # ':=' would store into the shared namespace; give it a throwaway copy.
+            namespace = namespace.copy()
+        # Restored by hand on both exits; no `finally` on this hot path.
         previous_line = self._active_expression_line
         self._active_expression_line = line
         try:
-            return eval(normalized, {"__builtins__": {}}, namespace)
-        except NameError as exc:
-            missing_name_match = re.search(r"'([^']+)'", str(exc))
-            missing_name = missing_name_match.group(1) if missing_name_match else "that name"
-            raise EppRuntimeError(
-                line,
-                f"I can't find '{missing_name}'. Try setting it first.",
-            ) from None
-        except SyntaxError:
-            raise EppRuntimeError(
-                line,
-                f"I couldn't read the expression '{expression}'.",
-            ) from None
+            code = plan[1]
+            if code is None:
+                # The expression did not compile when planned; compile again so the
+                # original error reaches the handler below.
+                code = compile(plan[2].lstrip(" \t"), "<epp-expr>", "eval")
+            value = eval(code, _EVAL_GLOBALS, namespace)
         except Exception as exc:
-            raise EppRuntimeError(
-                line,
-                f"I couldn't evaluate '{expression}': {exc}",
-            ) from None
-        finally:
             self._active_expression_line = previous_line
+            raise self._expression_error(exc, expression, line) from None
+        self._active_expression_line = previous_line
+        return value
 
-    def _build_namespace(self) -> dict[str, Any]:
-        merged: dict[str, Any] = {}
-        for scope in self.scopes:
-            merged.update(scope)
+    @staticmethod
+    def _expression_error(exc: Exception, expression: str, line: int) -> EppRuntimeError:
+        if isinstance(exc, NameError):
+            message = str(exc)
+            start = message.find("'")
+            end = message.find("'", start + 1) if start >= 0 else -1
+            missing_name = message[start + 1 : end] if end > start + 1 else "that name"
+            return EppRuntimeError(line, f"I can't find '{missing_name}'. Try setting it first.")
+        if isinstance(exc, SyntaxError):
+            return EppRuntimeError(line, f"I couldn't read the expression '{expression}'.")
+        return EppRuntimeError(line, f"I couldn't evaluate '{expression}': {exc}")
+
+    def _expression_plan(self, expression: str) -> tuple[Any, ...]:
+        """Return the cached evaluation plan for a raw expression string.
+
+        Plans are (_PLAN_CALL, name, argument_strings), (_PLAN_NAME, name),
+        (_PLAN_CONST, value, normalized), or (_PLAN_EVAL, code_or_None, normalized,
+        needs_private_namespace). Normalization, call parsing, argument splitting,
+        and compilation run once per distinct string.
+        """
+
+        plan = self._expr_cache.get(expression)
+        if plan is not None:
+            return plan
+
+        normalized = normalize_expression(expression)
+        call_expression = self._parse_call_expression(normalized)
+        name = normalized.strip()
+        if call_expression:
+            function_name, raw_arguments = call_expression
+            plan = (_PLAN_CALL, function_name, tuple(self._split_arguments(raw_arguments)))
+        elif name.isidentifier() and name.isascii() and not iskeyword(name):
+            plan = (_PLAN_NAME, name)
+        else:
+            code = self._compile_expression(normalized)
+            plan = self._constant_plan(code, normalized) or (_PLAN_EVAL, code, normalized, ":=" in normalized)
+        cache = self._expr_cache
+        if len(cache) >= _EXPR_CACHE_LIMIT:
+            del cache[next(iter(cache))]
+        cache[expression] = plan
+        return plan
 
-        namespace = self._base_namespace()
-        for name, value in merged.items():
+    @staticmethod
+    def _constant_plan(code: Optional[CodeType], normalized: str) -> Optional[tuple[Any, ...]]:
+        """Plan a literal like `5`, `"hi"`, or `(1, 2)` as its value, skipping eval."""
+
+        # Literals never load names; anything that does can't be one.
+        if code is None or code.co_names:
+            return None
+        try:
+            value = ast.literal_eval(normalized.strip())
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            return None
+        if not EppInterpreter._is_immutable_literal(value):
+            return None
+        return (_PLAN_CONST, value, normalized)
+
+    @staticmethod
+    def _is_immutable_literal(value: Any) -> bool:
+        if type(value) is tuple:
+            return all(EppInterpreter._is_immutable_literal(item) for item in value)
+        return type(value) in _IMMUTABLE_LITERAL_TYPES
+
+    def _compile_expression(self, normalized: str) -> Optional[CodeType]:
+        """Compile normalized expression text once; None if it doesn't compile.
+
+        Keyed after normalization, so spellings like 'random number' and
+        'random()' share one code object.
+        """
+
+        cache = self._code_cache
+        if normalized in cache:
+            return cache[normalized]
+        try:
+            # eval() of a string ignores leading spaces and tabs; compile() does not.
+            code: Optional[CodeType] = compile(normalized.lstrip(" \t"), "<epp-expr>", "eval")
+        except Exception:
+            code = None
+        if len(cache) >= _EXPR_CACHE_LIMIT:
+            del cache[next(iter(cache))]
+        cache[normalized] = code
+        return code
+
+    def _lookup_name(self, name: str, line: int) -> Any:
+        """Resolve a bare variable name the same way eval would, without eval."""
+
+        scope = self._find_scope(name)
+        if scope is not None:
+            value = scope[name]
             if isinstance(value, EppFunction):
-                namespace[name] = self._make_function_proxy(value)
-            else:
-                namespace[name] = value
+                return self._make_function_proxy(value)
+            return value
+
+        builtins = self._builtins
+        if name in builtins:
+            return builtins[name]
+        raise EppRuntimeError(line, f"I can't find '{name}'. Try setting it first.")
+
+    def _build_namespace(self) -> dict[str, Any]:
+        if self._namespace_generation == self._scope_generation:
+            return self._namespace_cache
+
+        # Later (inner) scopes overwrite earlier ones, matching _find_scope.
+        namespace = _Namespace(self._builtins)
+        for scope in self.scopes:
+            for name, value in scope.items():
+                if isinstance(value, EppFunction):
+                    namespace[name] = self._make_function_proxy(value)
+                else:
+                    namespace[name] = value
+        # Also the globals of compiled function bodies, which read builtins from here.
+        namespace["__builtins__"] = _EVAL_GLOBALS["__builtins__"]
+        self._namespace_cache = namespace
+        self._namespace_generation = self._scope_generation
         return namespace
 
+    def _assign(self, scope: dict[str, Any], name: str, value: Any) -> None:
+        """Store a variable, keeping a still-valid cached namespace in step.
+
+        `scope` must be the current scope or the innermost one holding `name`,
+        so the namespace entry it shadows is exactly this one.
+        """
+
+        scope[name] = value
+        if scope is not self.scopes[-1]:
+            self._outer_writes += 1
+        if self._namespace_generation == self._scope_generation:
+            self._namespace_cache[name] = (
+                self._make_function_proxy(value) if isinstance(value, EppFunction) else value
+            )
+
+    def reset(self) -> None:
+        """Forget all variables and functions, as if the interpreter were new."""
+
+        self.global_scope.clear()
+        self.scopes = [self.global_scope]
+        self._scope_generation += 1
+
     def _base_namespace(self) -> dict[str, Any]:
+        """Return a fresh, caller-owned copy of the builtin functions."""
+
+        return dict(self._builtins)
+
+    def _create_builtins(self) -> dict[str, Any]:
         return {
-            "len": len,
-            "str": str,
-            "int": int,
-            "float": float,
-            "bool": bool,
-            "range": range,
-            "list": list,
-            "abs": abs,
-            "min": min,
-            "max": max,
-            "sum": sum,
-            "round": round,
-            "sorted": sorted,
+            **_STATIC_BUILTINS,
             "random": self._fn_random,
-            "random_int": random.randint,
-            "random_float": random.uniform,
-            "choice": random.choice,
-            "sleep": time.sleep,
+            "random_int": self._rng.randint,
+            "random_float": self._rng.uniform,
+            "choice": self._rng.choice,
+            "set_seed": self._fn_set_seed,
             "flask_app": self._fn_flask_app,
             "flask_get": self._fn_flask_get,
             "flask_post": self._fn_flask_post,
@@ -883,6 +1589,7 @@ class EppInterpreter:
             "flask_html": self._fn_flask_html,
             "flask_fetch": self._fn_flask_fetch,
             "flask_fetch_json": self._fn_flask_fetch_json,
+            "flask_fetch_many": self._fn_flask_fetch_many,
             "create_web_app": self._fn_flask_app,
             "when_someone_visits": self._fn_flask_get,
             "when_someone_posts": self._fn_flask_post,
@@ -891,6 +1598,7 @@ class EppInterpreter:
             "make_html_page": self._fn_flask_html,
             "fetch_from_api": self._fn_flask_fetch,
             "fetch_json_from_api": self._fn_flask_fetch_json,
+            "fetch_many": self._fn_flask_fetch_many,
             "open_window": self._fn_open_window,
             "close_window": self._fn_close_window,
             "window_is_open": self._fn_window_is_open,
@@ -900,12 +1608,15 @@ class EppInterpreter:
             "clear_screen": self._fn_clear_screen,
             "draw_pixel": self._fn_draw_pixel,
             "draw_rect": self._fn_draw_rect,
+            "draw_pixels": self._fn_draw_pixels,
             "draw_text": self._fn_draw_text,
             "key_down": self._fn_key_down,
             "key_pressed": self._fn_key_pressed,
             "set_window_title": self._fn_set_window_title,
         }
 
+    # The window builtins hand arguments straight to PixelWindow, which coerces them
+    # once with _to_int/_to_str.
     def _fn_open_window(
         self,
         width: Any,
@@ -915,11 +1626,11 @@ class EppInterpreter:
         background: Any = "black",
     ) -> bool:
         return self.pixel_window.open(
-            width=int(width),
-            height=int(height),
-            title=str(title),
-            pixel_size=int(pixel_size),
-            background=str(background),
+            width=width,
+            height=height,
+            title=title,
+            pixel_size=pixel_size,
+            background=background,
         )
 
     def _fn_close_window(self) -> None:
@@ -935,13 +1646,16 @@ class EppInterpreter:
         self.pixel_window.present()
 
     def _fn_clear_screen(self, color: Any = "black") -> None:
-        self.pixel_window.clear(str(color))
+        self.pixel_window.clear(_to_str(color))
 
     def _fn_draw_pixel(self, x: Any, y: Any, color: Any = "white") -> None:
-        self.pixel_window.draw_pixel(int(x), int(y), str(color))
+        self.pixel_window.draw_pixel(x, y, color)
+
+    def _fn_draw_pixels(self, xs: Any, ys: Any, color: Any = "white") -> None:
+        self.pixel_window.draw_pixels(xs, ys, color)
 
     def _fn_draw_rect(self, x: Any, y: Any, w: Any, h: Any, color: Any = "white") -> None:
-        self.pixel_window.draw_rect(int(x), int(y), int(w), int(h), str(color))
+        self.pixel_window.draw_rect(x, y, w, h, color)
 
     def _fn_draw_text(
         self,
@@ -951,13 +1665,13 @@ class EppInterpreter:
         color: Any = "white",
         size: Any = 12,
     ) -> None:
-        self.pixel_window.draw_text(int(x), int(y), text, str(color), int(size))
+        self.pixel_window.draw_text(x, y, text, color, size)
 
     def _fn_key_down(self, key_name: Any) -> bool:
-        return self.pixel_window.key_down(str(key_name))
+        return self.pixel_window.key_down(key_name)
 
     def _fn_key_pressed(self, key_name: Any) -> bool:
-        return self.pixel_window.key_pressed(str(key_name))
+        return self.pixel_window.key_pressed(key_name)
 
     def _fn_set_window_title(self, title: Any) -> None:
         self.pixel_window.set_title(title)
@@ -1018,6 +1732,10 @@ class EppInterpreter:
             return {}
         if not isinstance(headers, dict):
             raise ValueError("Headers must be a dictionary like {\"Authorization\": \"Bearer ...\"}.")
+        # Always a copy: callers add defaults with setdefault, and the dict may be
+        # a variable in the E++ program.
+        if all(type(key) is str and type(value) is str for key, value in headers.items()):
+            return dict(headers)
         return {str(key): str(value) for key, value in headers.items()}
 
     @staticmethod
@@ -1036,13 +1754,26 @@ class EppInterpreter:
         headers: Any = None,
         timeout: Any = 10,
     ) -> str:
+        raw = self._fetch_raw(url, method=method, body=body, headers=headers, timeout=timeout)
+        return raw.decode("utf-8", errors="replace")
+
+    def _fetch_raw(
+        self,
+        url: Any,
+        method: Any = "GET",
+        body: Any = None,
+        headers: Any = None,
+        timeout: Any = 10,
+    ) -> bytes:
+        """Perform a fetch and return the undecoded response body."""
+
         url_text = str(url).strip()
         if not url_text:
             raise ValueError("Please provide a URL to fetch.")
 
         method_text = str(method).upper().strip() or "GET"
         timeout_value = float(timeout)
-        request_headers = self._normalize_headers(headers)
+        request_headers = {} if headers is None else self._normalize_headers(headers)
 
         payload: bytes | None = None
         if body is not None:
@@ -1054,6 +1785,17 @@ class EppInterpreter:
             else:
                 payload = str(body).encode("utf-8")
 
+        http_pool = self._http
+        if http_pool.handles(url_text):
+            try:
+                status, raw = http_pool.request(method_text, url_text, payload, request_headers, timeout_value)
+            except (OSError, http.client.HTTPException) as exc:
+                raise ValueError(f"API request failed: {exc}") from None
+            if not 200 <= status < 300:
+                detail = raw.decode("utf-8", errors="replace")
+                raise ValueError(f"API request failed with HTTP {status}: {detail}")
+            return raw
+
         request = urllib.request.Request(
             url=url_text,
             data=payload,
@@ -1063,8 +1805,7 @@ class EppInterpreter:
 
         try:
             with urllib.request.urlopen(request, timeout=timeout_value) as response:
-                raw = response.read()
-                return raw.decode("utf-8", errors="replace")
+                return response.read()
         except urllib.error.HTTPError as exc:
             try:
                 detail = exc.read().decode("utf-8", errors="replace")
@@ -1074,6 +1815,32 @@ class EppInterpreter:
         except urllib.error.URLError as exc:
             raise ValueError(f"API request failed: {exc.reason}") from None
 
+    def _fn_flask_fetch_many(
+        self,
+        urls: Any,
+        method: Any = "GET",
+        body: Any = None,
+        headers: Any = None,
+        timeout: Any = 10,
+    ) -> list[str]:
+        if isinstance(urls, (str, bytes)) or not isinstance(urls, (list, tuple)):
+            raise ValueError("fetch_many needs a list of URLs, like [\"https://a\", \"https://b\"].")
+        if not urls:
+            return []
+
+        # Requests wait on the network with the GIL released, so a thread per URL
+        # overlaps their latencies; results keep the order of the input list.
+        executor = self._fetch_executor
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=_FETCH_MANY_WORKERS, thread_name_prefix="epp-fetch")
+            self._fetch_executor = executor
+        return list(
+            executor.map(
+                lambda url: self._fn_flask_fetch(url, method=method, body=body, headers=headers, timeout=timeout),
+                urls,
+            )
+        )
+
     def _fn_flask_fetch_json(
         self,
         url: Any,
@@ -1082,62 +1849,28 @@ class EppInterpreter:
         headers: Any = None,
         timeout: Any = 10,
     ) -> Any:
-        text = self._fn_flask_fetch(
+        raw = self._fetch_raw(
             url=url,
             method=method,
             body=body,
             headers=headers,
             timeout=timeout,
         )
+        try:
+            # json.loads decodes bytes itself, skipping an intermediate str.
+            return json.loads(raw)
+        except UnicodeDecodeError:
+            text = raw.decode("utf-8", errors="replace")
+        except json.JSONDecodeError:
+            raise ValueError("The API response was not valid JSON.") from None
         try:
             return json.loads(text)
         except json.JSONDecodeError:
             raise ValueError("The API response was not valid JSON.") from None
 
-    @staticmethod
-    def _normalize_expression(expression: str) -> str:
-        stripped = expression.strip()
-        fetch_json_match = re.fullmatch(r"fetch\s+json\s+from\s+(.+)", stripped, flags=re.IGNORECASE)
-        if fetch_json_match:
-            expression = f"fetch_json_from_api({fetch_json_match.group(1).strip()})"
-            stripped = expression.strip()
-
-        fetch_match = re.fullmatch(r"fetch\s+from\s+(.+)", stripped, flags=re.IGNORECASE)
-        if fetch_match:
-            expression = f"fetch_from_api({fetch_match.group(1).strip()})"
-            stripped = expression.strip()
-
-        html_match = re.fullmatch(r"(?:html|web)\s+page\s+(.+)", stripped, flags=re.IGNORECASE)
-        if html_match:
-            expression = f"make_html_page({html_match.group(1).strip()})"
-            stripped = expression.strip()
-
-        if re.fullmatch(r"random(?:\s+number)?", stripped, flags=re.IGNORECASE):
-            expression = "random()"
-        else:
-            between_match = re.fullmatch(
-                r"random(?:\s+number)?\s+between\s+(.+?)\s+and\s+(.+)",
-                stripped,
-                flags=re.IGNORECASE,
-            )
-            if between_match:
-                low = between_match.group(1).strip()
-                high = between_match.group(2).strip()
-                expression = f"random({low}, {high})"
-            else:
-                choice_match = re.fullmatch(r"random\s+choice\s+from\s+(.+)", stripped, flags=re.IGNORECASE)
-                if choice_match:
-                    expression = f"choice({choice_match.group(1).strip()})"
-
-        expression = re.sub(r"\btrue\b", "True", expression, flags=re.IGNORECASE)
-        expression = re.sub(r"\bfalse\b", "False", expression, flags=re.IGNORECASE)
-        expression = re.sub(r"\bnothing\b", "None", expression, flags=re.IGNORECASE)
-        return expression
-
-    @staticmethod
-    def _fn_random(minimum: Any = None, maximum: Any = None) -> Any:
+    def _fn_random(self, minimum: Any = None, maximum: Any = None) -> Any:
         if minimum is None and maximum is None:
-            return random.random()
+            return self._rng.random()
 
         if minimum is None or maximum is None:
             raise ValueError("random(...) needs either 0 arguments or 2 arguments.")
@@ -1149,21 +1882,20 @@ class EppInterpreter:
         if isinstance(minimum, int) and isinstance(maximum, int):
             low = min(minimum, maximum)
             high = max(minimum, maximum)
-            return random.randint(low, high)
+            return self._rng.randint(low, high)
 
         low = float(minimum)
         high = float(maximum)
         if low > high:
             low, high = high, low
-        return random.uniform(low, high)
+        return self._rng.uniform(low, high)
+
+    def _fn_set_seed(self, seed: Any) -> None:
+        self._rng.seed(seed)
 
     @staticmethod
     def _parse_call_expression(expression: str) -> Optional[tuple[str, str]]:
-        match = re.fullmatch(
-            r"(?:call|run)\s+([A-Za-z_][A-Za-z0-9_]*)(?:\s+with\s+(.+))?",
-            expression.strip(),
-            flags=re.IGNORECASE,
-        )
+        match = _CALL_EXPRESSION_RE.fullmatch(expression.strip())
         if not match:
             return None
         return match.group(1), (match.group(2) or "").strip()
@@ -1174,58 +1906,65 @@ class EppInterpreter:
         if not raw:
             return []
 
+        # Scan by index and slice each argument out of raw; quoted runs are
+        # skipped with str.find so their characters never reach the loop.
         arguments: list[str] = []
-        chunk: list[str] = []
-        quote_char: Optional[str] = None
         depth = 0
-
-        for character in raw:
-            if quote_char:
-                chunk.append(character)
-                if character == quote_char:
-                    quote_char = None
-                continue
-
-            if character in {'"', "'"}:
-                quote_char = character
-                chunk.append(character)
+        start = 0
+        index = 0
+        length = len(raw)
+        while index < length:
+            character = raw[index]
+            if character == '"' or character == "'":
+                closing = raw.find(character, index + 1)
+                index = length if closing < 0 else closing + 1
                 continue
-
             if character in "([{":
                 depth += 1
-                chunk.append(character)
-                continue
-
-            if character in ")]}":
+            elif character in ")]}":
                 depth = max(depth - 1, 0)
-                chunk.append(character)
-                continue
-
-            if character == "," and depth == 0:
-                candidate = "".join(chunk).strip()
+            elif character == "," and depth == 0:
+                candidate = raw[start:index].strip()
                 if candidate:
                     arguments.append(candidate)
-                chunk = []
-                continue
-
-            chunk.append(character)
+                start = index + 1
+            index += 1
 
-        candidate = "".join(chunk).strip()
+        candidate = raw[start:].strip()
         if candidate:
             arguments.append(candidate)
         return arguments
 
     def _make_function_proxy(self, function: EppFunction) -> Callable[..., Any]:
+        cached = function.proxy
+        if cached is not None:
+            return cached
+
+        # *args keeps arity errors in E++ wording; the tuple is passed through as is.
         def proxy(*args: Any) -> Any:
-            return self._call_user_function(function, list(args), self._active_expression_line)
+            return self._call_user_function(function, args, self._active_expression_line)
 
+        function.proxy = proxy
         return proxy
 
-    def _scope_with_name(self, name: str, line: int) -> dict[str, Any]:
-        for scope in reversed(self.scopes):
+    def _find_scope(self, name: str) -> Optional[dict[str, Any]]:
+        scopes = self.scopes
+        # Parameters and locals live in the innermost frame, so probe it first.
+        innermost = scopes[-1]
+        if name in innermost:
+            return innermost
+        if len(scopes) <= 2:
+            # Top level or one call deep: the only other frame is the global scope.
+            outermost = scopes[0]
+            return outermost if name in outermost else None
+        for index in range(len(scopes) - 2, -1, -1):
+            scope = scopes[index]
             if name in scope:
                 return scope
-        raise EppRuntimeError(line, f"I can't find '{name}'. Try 'set {name} to ...' first.")
+        return None
 
-    def _current_scope(self) -> dict[str, Any]:
-        return self.scopes[-1]
+    def _scope_with_name(self, name: str, line: int) -> dict[str, Any]:
+        scope = self._find_scope(name)
+        if scope is not None:
+            return scope
+        raise EppRuntimeError(line, f"I can't find '{name}'. Try 'set {name} to ...' first.")
@@ -7,15 +7,25 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable, Iterator
 
+# LineToken kinds. Every token shares one of these string objects.
+KIND_STATEMENT = "STATEMENT"
+KIND_COMMENT = "COMMENT"
+KIND_BLANK = "BLANK"
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class LineToken:
-    """A single source line with metadata for parser error reporting."""
+    """A single source line with metadata for parser error reporting.
+
+    Only statements keep their raw line; comments keep the stripped comment and
+    blank lines keep an empty string.
+    """
 
     line: int
     text: str
-    kind: str  # "STATEMENT", "COMMENT", or "BLANK"
+    kind: str  # KIND_STATEMENT, KIND_COMMENT, or KIND_BLANK
 
 
 class EppLexerError(Exception):
@@ -34,27 +44,51 @@ class EppLexer:
     """Converts raw E++ source into line tokens."""
 
     def tokenize(self, source: str) -> list[LineToken]:
-        tokens: list[LineToken] = []
-
-        for line_number, raw_line in enumerate(source.splitlines(), start=1):
-            if line_number == 1 and raw_line.startswith("\ufeff"):
-                # Handle UTF-8 files that include a BOM.
-                raw_line = raw_line.lstrip("\ufeff")
-
-            if "\x00" in raw_line:
-                raise EppLexerError(line_number, "I found an invalid null character.")
-
-            stripped = raw_line.strip()
-            if not stripped:
-                kind = "BLANK"
-            elif stripped.startswith("#"):
-                kind = "COMMENT"
-            else:
-                kind = "STATEMENT"
-
-            tokens.append(LineToken(line=line_number, text=raw_line, kind=kind))
-
-        return tokens
+        null_index = source.find("\x00")
+        if null_index >= 0:
+            # Count lines the way splitlines does, up to and including the null.
+            line_number = len(source[: null_index + 1].splitlines())
+            raise EppLexerError(line_number, "I found an invalid null character.")
+
+        lines = source.splitlines()
+        if lines and lines[0].startswith("\ufeff"):
+            # Handle UTF-8 files that include a BOM.
+            lines[0] = lines[0].lstrip("\ufeff")
+
+        return [
+            LineToken(line_number, raw_line, KIND_STATEMENT)
+            if (stripped := raw_line.strip()) and stripped[0] != "#"
+            else LineToken(line_number, stripped, KIND_COMMENT)
+            if stripped
+            else LineToken(line_number, "", KIND_BLANK)
+            for line_number, raw_line in enumerate(lines, start=1)
+        ]
+
+    def tokenize_lines(self, lines: Iterable[str], start_line: int = 1) -> Iterator[LineToken]:
+        """Lazily tokenize chunks of source, such as the lines of an open file.
+
+        Each chunk may hold several lines; together they produce the same tokens
+        as tokenize() on the joined text, numbered from start_line.
+        """
+
+        line_number = start_line - 1
+        for chunk in lines:
+            null_index = chunk.find("\x00")
+            if null_index >= 0:
+                null_line = line_number + len(chunk[: null_index + 1].splitlines())
+                raise EppLexerError(null_line, "I found an invalid null character.")
+
+            for raw_line in chunk.splitlines():
+                line_number += 1
+                if line_number == start_line and raw_line.startswith("\ufeff"):
+                    raw_line = raw_line.lstrip("\ufeff")
+                stripped = raw_line.strip()
+                if not stripped:
+                    yield LineToken(line_number, "", KIND_BLANK)
+                elif stripped[0] == "#":
+                    yield LineToken(line_number, stripped, KIND_COMMENT)
+                else:
+                    yield LineToken(line_number, raw_line, KIND_STATEMENT)
 
 
 def tokenize_file(path: str | Path) -> list[LineToken]:
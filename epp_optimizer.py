@@ -0,0 +1,272 @@
+"""Optional AST rewrites for E++.
+
+fold() runs between parsing and execution. It folds constant arithmetic in
+expressions, settles conditions that compare two constants, and removes the
+if/while branches those conditions make unreachable, along with statements that
+follow a return, stop or skip in the same block. Every rewrite keeps the
+program's behaviour; anything it is unsure about is left as written.
+"""
+
+from __future__ import annotations
+
+import ast
+from dataclasses import replace
+import math
+import operator
+from typing import Any, Callable, Optional
+
+from epp_interpreter import CONDITION_OPERATORS, normalize_expression
+from epp_parser import (
+    AddStatement,
+    AskStatement,
+    BreakStatement,
+    CallStatement,
+    Condition,
+    ContinueStatement,
+    DivideStatement,
+    ElseIfBranch,
+    ForEachStatement,
+    FunctionDefStatement,
+    IfStatement,
+    MultiplyStatement,
+    Program,
+    RemoveStatement,
+    RepeatTimesStatement,
+    RepeatWhileStatement,
+    ReturnStatement,
+    SayStatement,
+    SetStatement,
+    Statement,
+    SubtractStatement,
+)
+
+# Expressions are folded in the form the interpreter will actually evaluate.
+_normalize = normalize_expression
+
+_CONSTANT_TYPES = (int, float, str, bool, type(None))
+_BINARY_OPERATORS: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+}
+_UNARY_OPERATORS: dict[type, Callable[[Any], Any]] = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+# Folded values longer than this stay as written; the source is easier to read.
+_MAX_FOLDED_LENGTH = 100
+
+# Statements that always leave their block; anything after them never runs.
+_JUMP_STATEMENTS = (ReturnStatement, BreakStatement, ContinueStatement)
+
+_TRUE_EXPRESSION = "True"
+_FALSE_EXPRESSION = "False"
+
+
+class _NotConstant(Exception):
+    """Raised while folding when an expression depends on runtime values."""
+
+
+# Errors that mean "leave this expression as written". Very long expressions
+# can exhaust the stack in ast.parse or _evaluate; the interpreter copes with them.
+_UNFOLDABLE = (_NotConstant, ArithmeticError, TypeError, ValueError, RecursionError, MemoryError)
+
+
+def fold(program: Program) -> Program:
+    """Return a folded copy of program; the original is left untouched."""
+
+    return Program(statements=_fold_block(program.statements))
+
+
+def _fold_block(statements: list[Statement]) -> list[Statement]:
+    folded: list[Statement] = []
+    for statement in statements:
+        folded.extend(_fold_statement(statement))
+        if folded and type(folded[-1]) in _JUMP_STATEMENTS:
+            break
+    return folded
+
+
+def _fold_statement(statement: Statement) -> list[Statement]:
+    """Fold one statement into the statements that replace it (maybe none)."""
+
+    kind = type(statement)
+    if kind is SetStatement or kind is SayStatement:
+        return [replace(statement, expression=_fold_expression(statement.expression))]
+    if kind in (AddStatement, SubtractStatement, MultiplyStatement, DivideStatement, RemoveStatement):
+        return [replace(statement, value_expression=_fold_expression(statement.value_expression))]
+    if kind is AskStatement:
+        return [replace(statement, prompt_expression=_fold_expression(statement.prompt_expression))]
+    if kind is ReturnStatement:
+        if statement.expression is None:
+            return [statement]
+        return [replace(statement, expression=_fold_expression(statement.expression))]
+    if kind is CallStatement:
+        return [replace(statement, arguments=[_fold_expression(argument) for argument in statement.arguments])]
+    if kind is RepeatTimesStatement:
+        return [
+            replace(
+                statement,
+                count_expression=_fold_expression(statement.count_expression),
+                body=_fold_block(statement.body),
+            )
+        ]
+    if kind is ForEachStatement:
+        return [
+            replace(
+                statement,
+                iterable_expression=_fold_expression(statement.iterable_expression),
+                body=_fold_block(statement.body),
+            )
+        ]
+    if kind is FunctionDefStatement:
+        return [replace(statement, body=_fold_block(statement.body))]
+    if kind is RepeatWhileStatement:
+        condition = _fold_condition(statement.condition)
+        if _constant_truth(condition) is False:
+            return []
+        return [replace(statement, condition=condition, body=_fold_block(statement.body))]
+    if kind is IfStatement:
+        return _fold_if(statement)
+    return [statement]
+
+
+def _fold_if(statement: IfStatement) -> list[Statement]:
+    branches: list[ElseIfBranch] = []
+    else_body = statement.else_body
+    candidates = [ElseIfBranch(condition=statement.condition, body=statement.body, line=statement.line)]
+    candidates.extend(statement.elif_branches)
+    for branch in candidates:
+        condition = _fold_condition(branch.condition)
+        truth = _constant_truth(condition)
+        if truth is False:
+            continue
+        if truth is True:
+            # Later branches can never run; this body becomes the fallback.
+            else_body = branch.body
+            break
+        branches.append(ElseIfBranch(condition=condition, body=branch.body, line=branch.line))
+
+    folded_else = _fold_block(else_body) if else_body is not None else None
+    if not branches:
+        # If bodies share the enclosing scope, so they can be spliced in place.
+        return folded_else or []
+
+    first, *rest = branches
+    return [
+        IfStatement(
+            condition=first.condition,
+            body=_fold_block(first.body),
+            elif_branches=[replace(branch, body=_fold_block(branch.body)) for branch in rest],
+            else_body=folded_else,
+            line=first.line,
+        )
+    ]
+
+
+def _fold_condition(condition: Condition) -> Condition:
+    left_expression = _fold_expression(condition.left_expression)
+    if condition.operator == "truthy":
+        found, value = _constant_value(left_expression)
+        if found:
+            left_expression = _TRUE_EXPRESSION if value else _FALSE_EXPRESSION
+        return replace(condition, left_expression=left_expression)
+
+    right_expression = _fold_expression(condition.right_expression or "")
+    compare = CONDITION_OPERATORS.get(condition.operator)
+    left_found, left = _constant_value(left_expression)
+    right_found, right = _constant_value(right_expression)
+    if compare is not None and left_found and right_found:
+        try:
+            outcome = bool(compare(left, right))
+        except Exception:
+            # Leave it for the interpreter to report with its usual message.
+            outcome = None
+        if outcome is not None:
+            return Condition(
+                left_expression=_TRUE_EXPRESSION if outcome else _FALSE_EXPRESSION,
+                operator="truthy",
+                right_expression=None,
+                line=condition.line,
+            )
+    return replace(condition, left_expression=left_expression, right_expression=right_expression)
+
+
+def _constant_truth(condition: Condition) -> Optional[bool]:
+    if condition.operator != "truthy":
+        return None
+    if condition.left_expression == _TRUE_EXPRESSION:
+        return True
+    if condition.left_expression == _FALSE_EXPRESSION:
+        return False
+    return None
+
+
+def _fold_expression(expression: str) -> str:
+    node = _parse_normalized(expression)
+    if not isinstance(node, (ast.BinOp, ast.UnaryOp)):
+        return expression
+    try:
+        value = _evaluate(node)
+        folded = repr(value)
+    except _UNFOLDABLE:
+        return expression
+    if type(value) is float and not math.isfinite(value):
+        return expression
+    # The folded text is normalized again at runtime, so it must come back unchanged.
+    if len(folded) > _MAX_FOLDED_LENGTH or _normalize(folded) != folded:
+        return expression
+    return folded
+
+
+def _constant_value(expression: str) -> tuple[bool, Any]:
+    node = _parse_normalized(expression)
+    if node is None:
+        return False, None
+    try:
+        return True, _evaluate(node)
+    except _UNFOLDABLE:
+        return False, None
+
+
+def _parse_normalized(expression: str) -> Optional[ast.expr]:
+    try:
+        return ast.parse(_normalize(expression).lstrip(" \t"), mode="eval").body
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+
+
+def _evaluate(node: ast.expr) -> Any:
+    if isinstance(node, ast.Constant):
+        if type(node.value) not in _CONSTANT_TYPES:
+            raise _NotConstant
+        return node.value
+    if isinstance(node, ast.UnaryOp):
+        unary = _UNARY_OPERATORS.get(type(node.op))
+        if unary is None:
+            raise _NotConstant
+        return unary(_evaluate(node.operand))
+    if isinstance(node, ast.BinOp):
+        binary = _BINARY_OPERATORS.get(type(node.op))
+        if binary is None:
+            raise _NotConstant
+        left = _evaluate(node.left)
+        right = _evaluate(node.right)
+        if binary is operator.mod and (isinstance(left, str) or isinstance(right, str)):
+            # str % value is formatting, not arithmetic.
+            raise _NotConstant
+        if binary is operator.mul and _repeats_too_long(left, right):
+            raise _NotConstant
+        return binary(left, right)
+    raise _NotConstant
+
+
+def _repeats_too_long(left: Any, right: Any) -> bool:
+    if isinstance(left, str) and isinstance(right, int):
+        return len(left) * right > _MAX_FOLDED_LENGTH
+    if isinstance(right, str) and isinstance(left, int):
+        return len(right) * left > _MAX_FOLDED_LENGTH
+    return False
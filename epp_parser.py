@@ -8,13 +8,115 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from difflib import get_close_matches
+from functools import lru_cache
 import re
-from typing import Optional
+import sys
+from typing import Iterable, Optional
 
 from epp_lexer import LineToken
 
 
-@dataclass
+# Patterns that end in a mandatory greedy (.+) are applied with match(): a
+# statement is a single line, so that group always runs to the end of the
+# text and the result is the same as fullmatch() without the end check.
+_SET_RE = re.compile(r"set\s+([A-Za-z_][A-Za-z0-9_]*)\s+to\s+(.+)", re.IGNORECASE)
+_LET_RE = re.compile(r"let\s+([A-Za-z_][A-Za-z0-9_]*)\s+be\s+(.+)", re.IGNORECASE)
+_PUT_RE = re.compile(r"put\s+(.+)\s+into\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+_SAY_RE = re.compile(r"(?:say|print|show)\s+(.+)", re.IGNORECASE)
+_ASK_RE = re.compile(
+    r"ask\s+(.+)\s+and\s+(?:store|save)\s+(?:in|as)\s+([A-Za-z_][A-Za-z0-9_]*)",
+    re.IGNORECASE,
+)
+_CREATE_WEBSITE_RE = re.compile(
+    r"(?:create|make|build)\s+(?:a\s+)?(?:website|web\s+site|web\s+app)"
+    r"(?:\s+called\s+(.+?))?\s+and\s+(?:store|save)\s+(?:it\s+)?(?:in|as)\s+([A-Za-z_][A-Za-z0-9_]*)",
+    re.IGNORECASE,
+)
+_VISIT_ROUTE_RE = re.compile(
+    r"when\s+someone\s+visits\s+(.+)\s+on\s+([A-Za-z_][A-Za-z0-9_]*)\s+(?:show|send|return)\s+(.+)",
+    re.IGNORECASE,
+)
+_POST_ROUTE_RE = re.compile(
+    r"when\s+someone\s+posts(?:\s+to)?\s+(.+)\s+on\s+([A-Za-z_][A-Za-z0-9_]*)\s+(?:show|send|return)\s+(.+)",
+    re.IGNORECASE,
+)
+_START_WEB_SERVER_RE = re.compile(
+    r"start\s+(?:the\s+)?(?:web|website)\s+server\s+for\s+([A-Za-z_][A-Za-z0-9_]*)"
+    r"(?:\s+on\s+(.+?)\s+port\s+(.+))?",
+    re.IGNORECASE,
+)
+_FETCH_JSON_RE = re.compile(
+    r"fetch\s+json\s+from\s+(.+)\s+and\s+(?:store|save)\s+(?:in|as)\s+([A-Za-z_][A-Za-z0-9_]*)",
+    re.IGNORECASE,
+)
+_FETCH_TEXT_RE = re.compile(
+    r"fetch\s+from\s+(.+)\s+and\s+(?:store|save)\s+(?:in|as)\s+([A-Za-z_][A-Za-z0-9_]*)",
+    re.IGNORECASE,
+)
+_CREATE_LIST_RE = re.compile(r"(?:create|make)\s+list\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+_ADD_RE = re.compile(r"add\s+(.+)\s+to\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+_INCREASE_RE = re.compile(r"increase\s+([A-Za-z_][A-Za-z0-9_]*)\s+by\s+(.+)", re.IGNORECASE)
+_SUBTRACT_RE = re.compile(r"subtract\s+(.+)\s+from\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+_DECREASE_RE = re.compile(r"decrease\s+([A-Za-z_][A-Za-z0-9_]*)\s+by\s+(.+)", re.IGNORECASE)
+_MULTIPLY_RE = re.compile(r"multiply\s+([A-Za-z_][A-Za-z0-9_]*)\s+by\s+(.+)", re.IGNORECASE)
+_DIVIDE_RE = re.compile(r"divide\s+([A-Za-z_][A-Za-z0-9_]*)\s+by\s+(.+)", re.IGNORECASE)
+_REMOVE_RE = re.compile(r"(?:remove|take)\s+(.+)\s+from\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+_IF_RE = re.compile(r"(?:if|when)\s+(.+)\s+then", re.IGNORECASE)
+_REPEAT_WHILE_RE = re.compile(r"repeat\s+while\s+(.+)", re.IGNORECASE)
+_WHILE_DO_RE = re.compile(r"while\s+(.+)\s+do", re.IGNORECASE)
+_REPEAT_TIMES_RE = re.compile(r"repeat\s+(.+)\s+times", re.IGNORECASE)
+_DO_TIMES_RE = re.compile(r"do\s+(.+)\s+times", re.IGNORECASE)
+_FOR_EACH_RE = re.compile(r"for\s+(?:each|every)\s+([A-Za-z_][A-Za-z0-9_]*)\s+in\s+(.+)", re.IGNORECASE)
+_DEFINE_RE = re.compile(r"(?:define|function)\s+([A-Za-z_][A-Za-z0-9_]*)(?:\s+with\s+(.+))?", re.IGNORECASE)
+_BREAK_RE = re.compile(r"(?:stop(?:\s+(?:repeat|for|loop))?|break(?:\s+loop)?)", re.IGNORECASE)
+_CONTINUE_RE = re.compile(r"(?:skip(?:\s+(?:repeat|for|loop))?|next(?:\s+loop)?)", re.IGNORECASE)
+_RETURN_RE = re.compile(r"(?:return|give\s+back)(?:\s+(.+))?", re.IGNORECASE)
+_CALL_RE = re.compile(r"(?:call|run)\s+([A-Za-z_][A-Za-z0-9_]*)(?:\s+with\s+(.+))?", re.IGNORECASE)
+_OTHERWISE_IF_RE = re.compile(r"(?:otherwise|or)\s+if\s+(.+)\s+then", re.IGNORECASE)
+
+# Order matters: longer phrases must be tried before their prefixes.
+_CONDITION_PATTERNS = (
+    (r"(.+?)\s+is\s+greater\s+than\s+or\s+equal\s+to\s+(.+)", ">="),
+    (r"(.+?)\s+is\s+less\s+than\s+or\s+equal\s+to\s+(.+)", "<="),
+    (r"(.+?)\s+is\s+not\s+equal\s+to\s+(.+)", "!="),
+    (r"(.+?)\s+is\s+equal\s+to\s+(.+)", "=="),
+    (r"(.+?)\s+is\s+at\s+least\s+(.+)", ">="),
+    (r"(.+?)\s+is\s+at\s+most\s+(.+)", "<="),
+    (r"(.+?)\s+does\s+not\s+contain\s+(.+)", "not_contains"),
+    (r"(.+?)\s+contains\s+(.+)", "contains"),
+    (r"(.+?)\s+is\s+greater\s+than\s+(.+)", ">"),
+    (r"(.+?)\s+is\s+bigger\s+than\s+(.+)", ">"),
+    (r"(.+?)\s+is\s+less\s+than\s+(.+)", "<"),
+    (r"(.+?)\s+is\s+smaller\s+than\s+(.+)", "<"),
+    (r"(.+?)\s+equals\s+(.+)", "=="),
+    (r"(.+?)\s+is\s+not\s+(.+)", "!="),
+)
+# One alternation tries the phrases in the same order as separate fullmatch
+# calls would. Alternative i captures groups 2i+1 and 2i+2, so the right-hand
+# group is always match.lastindex.
+_CONDITION_RE = re.compile(
+    "|".join(f"(?:{pattern})" for pattern, _ in _CONDITION_PATTERNS),
+    re.IGNORECASE,
+)
+_CONDITION_OPERATORS = tuple(operator for _, operator in _CONDITION_PATTERNS)
+# Longer conditions are rarely repeated and would only crowd the cache.
+_CONDITION_CACHE_MAX_LENGTH = 200
+
+_PARAMETER_SEPARATOR_RE = re.compile(r"\s+and\s+", re.IGNORECASE)
+# Closing words each kind of block waits for.
+_NO_END_KEYWORDS: frozenset[str] = frozenset()
+_END_REPEAT = frozenset({"end repeat"})
+_END_FOR = frozenset({"end for"})
+_END_DEFINE = frozenset({"end define"})
+_END_IF = frozenset({"end if"})
+_END_IF_OR_OTHERWISE = frozenset({"otherwise", "end if"})
+
+_SUGGESTION_CUTOFF = 0.45
+
+_ARGUMENT_DELIMITER_RE = re.compile(r"[\"',()\[\]{}]")
+
+
+@dataclass(slots=True)
 class Program:
     statements: list["Statement"]
 
@@ -22,69 +124,71 @@ class Program:
 class Statement:
     """Marker base class for AST statement nodes."""
 
+    __slots__ = ()
 
-@dataclass
+
+@dataclass(slots=True)
 class SetStatement(Statement):
     name: str
     expression: str
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class SayStatement(Statement):
     expression: str
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class AddStatement(Statement):
     value_expression: str
     target_name: str
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class SubtractStatement(Statement):
     value_expression: str
     target_name: str
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class MultiplyStatement(Statement):
     target_name: str
     value_expression: str
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class DivideStatement(Statement):
     target_name: str
     value_expression: str
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class CreateListStatement(Statement):
     name: str
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class RemoveStatement(Statement):
     value_expression: str
     list_name: str
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class AskStatement(Statement):
     prompt_expression: str
     target_name: str
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Condition:
     left_expression: str
     operator: str  # ">", "<", ">=", "<=", "==", "!=", "contains", "not_contains", "truthy"
@@ -92,14 +196,14 @@ class Condition:
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ElseIfBranch:
     condition: Condition
     body: list["Statement"]
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class IfStatement(Statement):
     condition: Condition
     body: list[Statement]
@@ -108,21 +212,21 @@ class IfStatement(Statement):
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class RepeatTimesStatement(Statement):
     count_expression: str
     body: list[Statement]
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class RepeatWhileStatement(Statement):
     condition: Condition
     body: list[Statement]
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ForEachStatement(Statement):
     item_name: str
     iterable_expression: str
@@ -130,7 +234,7 @@ class ForEachStatement(Statement):
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionDefStatement(Statement):
     name: str
     params: list[str]
@@ -138,25 +242,25 @@ class FunctionDefStatement(Statement):
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ReturnStatement(Statement):
     expression: Optional[str]
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class CallStatement(Statement):
     name: str
     arguments: list[str]
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class BreakStatement(Statement):
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ContinueStatement(Statement):
     line: int
 
@@ -204,6 +308,10 @@ class EppParser:
     CLOSING_PREFIX_ALIASES = {
         "or if ": "otherwise if ",
     }
+    # Prefix aliases keyed by their first word (one alias per first word).
+    _PREFIX_ALIAS_BY_FIRST_WORD = {
+        alias.split(" ", 1)[0]: (alias, target_prefix) for alias, target_prefix in CLOSING_PREFIX_ALIASES.items()
+    }
     COMMAND_SUGGESTIONS = {
         "set": "set x to 10",
         "let": "let x be 10",
@@ -258,119 +366,140 @@ class EppParser:
         "end for": "end for",
         "finish for": "finish for",
     }
+    _SUGGESTION_KEYS = tuple(COMMAND_SUGGESTIONS)
+    _SUGGESTION_KEYS_BY_LENGTH: dict[int, list[str]] = {}
+    for _key in _SUGGESTION_KEYS:
+        _SUGGESTION_KEYS_BY_LENGTH.setdefault(len(_key), []).append(_key)
+    del _key
 
-    def __init__(self, tokens: list[LineToken]) -> None:
-        self.tokens = tokens
-        self.position = 0
+    def __init__(self, tokens: Iterable[LineToken]) -> None:
+        # Tokens are pulled lazily; nested blocks share the one iterator.
+        self._tokens = iter(tokens)
+        self._last_line = 1
 
     def parse(self) -> Program:
-        body, _, _ = self._parse_block(end_keywords=set())
+        body, _, _ = self._parse_block(end_keywords=_NO_END_KEYWORDS)
         return Program(statements=body)
 
     def _parse_block(
         self,
-        end_keywords: set[str],
+        end_keywords: frozenset[str],
         end_prefixes: tuple[str, ...] = (),
     ) -> tuple[list[Statement], Optional[str], Optional[int]]:
         statements: list[Statement] = []
+        token: Optional[LineToken] = None
 
-        while self._has_more():
-            token = self._advance()
+        for token in self._tokens:
             if token.kind != "STATEMENT":
                 continue
 
-            canonical = self._canonical(token.text)
-            canonical = self._normalize_closing_token(canonical)
-            if canonical in end_keywords:
-                return statements, token.text.strip(), token.line
-
-            if any(canonical.startswith(prefix) for prefix in end_prefixes):
+            canonical = self._normalize_closing_token(self._canonical(token.text))
+            if canonical in end_keywords or (end_prefixes and canonical.startswith(end_prefixes)):
+                self._last_line = token.line
                 return statements, token.text.strip(), token.line
 
             if self._is_closing_keyword(canonical):
                 if end_keywords:
-                    expected_parts = sorted(end_keywords)
-                    expected_parts.extend(prefix.strip() + "..." for prefix in end_prefixes)
-                    expected = " or ".join(expected_parts)
-                    suggestion = f"I expected {expected} before this line."
+                    suggestion = f"I expected {self._expected_text(end_keywords, end_prefixes)} before this line."
                 else:
                     suggestion = "This closing word does not match any open block."
                 raise EppParseError(token.line, f"'{token.text.strip()}' is out of place.", suggestion)
 
+            self._last_line = token.line
             statements.append(self._parse_statement(token))
 
+        # Nested blocks record the lines of the statements and closing words
+        # they read, so the last line read is whichever of the two came later.
+        if token is not None and token.line > self._last_line:
+            self._last_line = token.line
         if end_keywords or end_prefixes:
-            expected_parts = sorted(end_keywords)
-            expected_parts.extend(prefix.strip() + "..." for prefix in end_prefixes)
-            expected = " or ".join(expected_parts)
-            line = self.tokens[-1].line if self.tokens else 1
+            expected = self._expected_text(end_keywords, end_prefixes)
             raise EppParseError(
-                line,
+                self._last_line,
                 f"I reached the end of the file, but I'm still waiting for {expected}.",
                 incomplete=True,
             )
 
         return statements, None, None
 
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _expected_text(end_keywords: frozenset[str], end_prefixes: tuple[str, ...]) -> str:
+        expected_parts = sorted(end_keywords)
+        expected_parts.extend(prefix.strip() + "..." for prefix in end_prefixes)
+        return " or ".join(expected_parts)
+
     def _parse_statement(self, token: LineToken) -> Statement:
         text = token.text.strip()
+        parts = text.split(None, 1)
+        keyword = parts[0].lower() if parts else ""
+
+        handlers = self._STATEMENT_HANDLERS.get(keyword)
+        if handlers is None and not keyword.isascii():
+            # IGNORECASE also folds a few non-ASCII letters onto keywords.
+            handlers = self._ALL_STATEMENT_HANDLERS
+        for handler in handlers or ():
+            statement = handler(self, text, token.line)
+            if statement is not None:
+                return statement
 
-        set_match = re.fullmatch(
-            r"(?:set\s+([A-Za-z_][A-Za-z0-9_]*)\s+to|let\s+([A-Za-z_][A-Za-z0-9_]*)\s+be)\s+(.+)",
-            text,
-            flags=re.IGNORECASE,
-        )
-        if set_match:
-            variable_name = set_match.group(1) or set_match.group(2)
+        self._raise_unknown_statement(token)
+        raise AssertionError("Unreachable")
+
+    def _parse_set(self, text: str, line: int) -> Optional[Statement]:
+        return self._parse_assignment(_SET_RE.match(text), line)
+
+    def _parse_let(self, text: str, line: int) -> Optional[Statement]:
+        return self._parse_assignment(_LET_RE.match(text), line)
+
+    def _parse_assignment(self, match: Optional[re.Match[str]], line: int) -> Optional[Statement]:
+        if match:
             return SetStatement(
-                name=variable_name,
-                expression=set_match.group(3).strip(),
-                line=token.line,
+                name=sys.intern(match.group(1)),
+                expression=match.group(2).strip(),
+                line=line,
             )
+        return None
 
-        put_match = re.fullmatch(r"put\s+(.+)\s+into\s+([A-Za-z_][A-Za-z0-9_]*)", text, flags=re.IGNORECASE)
+    def _parse_put(self, text: str, line: int) -> Optional[Statement]:
+        put_match = _PUT_RE.fullmatch(text)
         if put_match:
             return SetStatement(
-                name=put_match.group(2),
+                name=sys.intern(put_match.group(2)),
                 expression=put_match.group(1).strip(),
-                line=token.line,
+                line=line,
             )
+        return None
 
-        say_match = re.fullmatch(r"(?:say|print|show)\s+(.+)", text, flags=re.IGNORECASE)
+    def _parse_say(self, text: str, line: int) -> Optional[Statement]:
+        say_match = _SAY_RE.match(text)
         if say_match:
-            return SayStatement(expression=say_match.group(1).strip(), line=token.line)
+            return SayStatement(expression=say_match.group(1).strip(), line=line)
+        return None
 
-        ask_match = re.fullmatch(
-            r"ask\s+(.+)\s+and\s+(?:store|save)\s+(?:in|as)\s+([A-Za-z_][A-Za-z0-9_]*)",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_ask(self, text: str, line: int) -> Optional[Statement]:
+        ask_match = _ASK_RE.fullmatch(text)
         if ask_match:
             return AskStatement(
                 prompt_expression=ask_match.group(1).strip(),
-                target_name=ask_match.group(2),
-                line=token.line,
+                target_name=sys.intern(ask_match.group(2)),
+                line=line,
             )
+        return None
 
-        create_website_match = re.fullmatch(
-            r"(?:create|make|build)\s+(?:a\s+)?(?:website|web\s+site|web\s+app)"
-            r"(?:\s+called\s+(.+?))?\s+and\s+(?:store|save)\s+(?:it\s+)?(?:in|as)\s+([A-Za-z_][A-Za-z0-9_]*)",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_create_website(self, text: str, line: int) -> Optional[Statement]:
+        create_website_match = _CREATE_WEBSITE_RE.fullmatch(text)
         if create_website_match:
             title_expression = create_website_match.group(1).strip() if create_website_match.group(1) else '"E++ Website"'
             return SetStatement(
-                name=create_website_match.group(2),
+                name=sys.intern(create_website_match.group(2)),
                 expression=f"call create_web_app with {title_expression}",
-                line=token.line,
+                line=line,
             )
+        return None
 
-        visit_route_match = re.fullmatch(
-            r"when\s+someone\s+visits\s+(.+)\s+on\s+([A-Za-z_][A-Za-z0-9_]*)\s+(?:show|send|return)\s+(.+)",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_visit_route(self, text: str, line: int) -> Optional[Statement]:
+        visit_route_match = _VISIT_ROUTE_RE.match(text)
         if visit_route_match:
             return CallStatement(
                 name="when_someone_visits",
@@ -379,14 +508,12 @@ class EppParser:
                     visit_route_match.group(1).strip(),
                     visit_route_match.group(3).strip(),
                 ],
-                line=token.line,
+                line=line,
             )
+        return None
 
-        post_route_match = re.fullmatch(
-            r"when\s+someone\s+posts(?:\s+to)?\s+(.+)\s+on\s+([A-Za-z_][A-Za-z0-9_]*)\s+(?:show|send|return)\s+(.+)",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_post_route(self, text: str, line: int) -> Optional[Statement]:
+        post_route_match = _POST_ROUTE_RE.match(text)
         if post_route_match:
             return CallStatement(
                 name="when_someone_posts",
@@ -395,15 +522,12 @@ class EppParser:
                     post_route_match.group(1).strip(),
                     post_route_match.group(3).strip(),
                 ],
-                line=token.line,
+                line=line,
             )
+        return None
 
-        start_web_server_match = re.fullmatch(
-            r"start\s+(?:the\s+)?(?:web|website)\s+server\s+for\s+([A-Za-z_][A-Za-z0-9_]*)"
-            r"(?:\s+on\s+(.+?)\s+port\s+(.+))?",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_start_web_server(self, text: str, line: int) -> Optional[Statement]:
+        start_web_server_match = _START_WEB_SERVER_RE.fullmatch(text)
         if start_web_server_match:
             arguments = [start_web_server_match.group(1)]
             host_expression = start_web_server_match.group(2)
@@ -411,201 +535,265 @@ class EppParser:
             if host_expression and port_expression:
                 arguments.append(host_expression.strip())
                 arguments.append(port_expression.strip())
-            return CallStatement(name="start_web_server", arguments=arguments, line=token.line)
+            return CallStatement(name="start_web_server", arguments=arguments, line=line)
+        return None
 
-        fetch_json_match = re.fullmatch(
-            r"fetch\s+json\s+from\s+(.+)\s+and\s+(?:store|save)\s+(?:in|as)\s+([A-Za-z_][A-Za-z0-9_]*)",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_fetch_json(self, text: str, line: int) -> Optional[Statement]:
+        fetch_json_match = _FETCH_JSON_RE.fullmatch(text)
         if fetch_json_match:
             return SetStatement(
-                name=fetch_json_match.group(2),
+                name=sys.intern(fetch_json_match.group(2)),
                 expression=f"call fetch_json_from_api with {fetch_json_match.group(1).strip()}",
-                line=token.line,
+                line=line,
             )
+        return None
 
-        fetch_text_match = re.fullmatch(
-            r"fetch\s+from\s+(.+)\s+and\s+(?:store|save)\s+(?:in|as)\s+([A-Za-z_][A-Za-z0-9_]*)",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_fetch_text(self, text: str, line: int) -> Optional[Statement]:
+        fetch_text_match = _FETCH_TEXT_RE.fullmatch(text)
         if fetch_text_match:
             return SetStatement(
-                name=fetch_text_match.group(2),
+                name=sys.intern(fetch_text_match.group(2)),
                 expression=f"call fetch_from_api with {fetch_text_match.group(1).strip()}",
-                line=token.line,
+                line=line,
             )
+        return None
 
-        create_list_match = re.fullmatch(r"(?:create|make)\s+list\s+([A-Za-z_][A-Za-z0-9_]*)", text, flags=re.IGNORECASE)
+    def _parse_create_list(self, text: str, line: int) -> Optional[Statement]:
+        create_list_match = _CREATE_LIST_RE.fullmatch(text)
         if create_list_match:
-            return CreateListStatement(name=create_list_match.group(1), line=token.line)
+            return CreateListStatement(name=sys.intern(create_list_match.group(1)), line=line)
+        return None
 
-        add_match = re.fullmatch(r"add\s+(.+)\s+to\s+([A-Za-z_][A-Za-z0-9_]*)", text, flags=re.IGNORECASE)
+    def _parse_add(self, text: str, line: int) -> Optional[Statement]:
+        add_match = _ADD_RE.fullmatch(text)
         if add_match:
             return AddStatement(
                 value_expression=add_match.group(1).strip(),
-                target_name=add_match.group(2),
-                line=token.line,
+                target_name=sys.intern(add_match.group(2)),
+                line=line,
             )
+        return None
 
-        increase_match = re.fullmatch(r"increase\s+([A-Za-z_][A-Za-z0-9_]*)\s+by\s+(.+)", text, flags=re.IGNORECASE)
+    def _parse_increase(self, text: str, line: int) -> Optional[Statement]:
+        increase_match = _INCREASE_RE.match(text)
         if increase_match:
             return AddStatement(
                 value_expression=increase_match.group(2).strip(),
-                target_name=increase_match.group(1),
-                line=token.line,
+                target_name=sys.intern(increase_match.group(1)),
+                line=line,
             )
+        return None
 
-        subtract_match = re.fullmatch(
-            r"subtract\s+(.+)\s+from\s+([A-Za-z_][A-Za-z0-9_]*)",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_subtract(self, text: str, line: int) -> Optional[Statement]:
+        subtract_match = _SUBTRACT_RE.fullmatch(text)
         if subtract_match:
             return SubtractStatement(
                 value_expression=subtract_match.group(1).strip(),
-                target_name=subtract_match.group(2),
-                line=token.line,
+                target_name=sys.intern(subtract_match.group(2)),
+                line=line,
             )
+        return None
 
-        decrease_match = re.fullmatch(r"decrease\s+([A-Za-z_][A-Za-z0-9_]*)\s+by\s+(.+)", text, flags=re.IGNORECASE)
+    def _parse_decrease(self, text: str, line: int) -> Optional[Statement]:
+        decrease_match = _DECREASE_RE.match(text)
         if decrease_match:
             return SubtractStatement(
                 value_expression=decrease_match.group(2).strip(),
-                target_name=decrease_match.group(1),
-                line=token.line,
+                target_name=sys.intern(decrease_match.group(1)),
+                line=line,
             )
+        return None
 
-        multiply_match = re.fullmatch(
-            r"multiply\s+([A-Za-z_][A-Za-z0-9_]*)\s+by\s+(.+)",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_multiply(self, text: str, line: int) -> Optional[Statement]:
+        multiply_match = _MULTIPLY_RE.match(text)
         if multiply_match:
             return MultiplyStatement(
-                target_name=multiply_match.group(1),
+                target_name=sys.intern(multiply_match.group(1)),
                 value_expression=multiply_match.group(2).strip(),
-                line=token.line,
+                line=line,
             )
+        return None
 
-        divide_match = re.fullmatch(
-            r"divide\s+([A-Za-z_][A-Za-z0-9_]*)\s+by\s+(.+)",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_divide(self, text: str, line: int) -> Optional[Statement]:
+        divide_match = _DIVIDE_RE.match(text)
         if divide_match:
             return DivideStatement(
-                target_name=divide_match.group(1),
+                target_name=sys.intern(divide_match.group(1)),
                 value_expression=divide_match.group(2).strip(),
-                line=token.line,
+                line=line,
             )
+        return None
 
-        remove_match = re.fullmatch(
-            r"(?:remove|take)\s+(.+)\s+from\s+([A-Za-z_][A-Za-z0-9_]*)",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_remove(self, text: str, line: int) -> Optional[Statement]:
+        remove_match = _REMOVE_RE.fullmatch(text)
         if remove_match:
             return RemoveStatement(
                 value_expression=remove_match.group(1).strip(),
-                list_name=remove_match.group(2),
-                line=token.line,
+                list_name=sys.intern(remove_match.group(2)),
+                line=line,
             )
+        return None
 
-        if_match = re.fullmatch(r"(?:if|when)\s+(.+)\s+then", text, flags=re.IGNORECASE)
+    def _parse_if(self, text: str, line: int) -> Optional[Statement]:
+        if_match = _IF_RE.fullmatch(text)
         if if_match:
             return self._parse_if_statement(
                 condition_text=if_match.group(1).strip(),
-                if_line=token.line,
+                if_line=line,
             )
+        return None
 
-        repeat_while_match = re.fullmatch(r"repeat\s+while\s+(.+)", text, flags=re.IGNORECASE)
+    def _parse_repeat_while(self, text: str, line: int) -> Optional[Statement]:
+        repeat_while_match = _REPEAT_WHILE_RE.match(text)
         if not repeat_while_match:
-            repeat_while_match = re.fullmatch(r"while\s+(.+)\s+do", text, flags=re.IGNORECASE)
+            repeat_while_match = _WHILE_DO_RE.fullmatch(text)
         if repeat_while_match:
-            condition = self._parse_condition(repeat_while_match.group(1).strip(), token.line)
-            body, _, _ = self._parse_block(end_keywords={"end repeat"})
-            return RepeatWhileStatement(condition=condition, body=body, line=token.line)
+            condition = self._parse_condition(repeat_while_match.group(1).strip(), line)
+            body, _, _ = self._parse_block(end_keywords=_END_REPEAT)
+            return RepeatWhileStatement(condition=condition, body=body, line=line)
+        return None
 
-        repeat_times_match = re.fullmatch(r"repeat\s+(.+)\s+times", text, flags=re.IGNORECASE)
+    def _parse_repeat_times(self, text: str, line: int) -> Optional[Statement]:
+        repeat_times_match = _REPEAT_TIMES_RE.fullmatch(text)
         if not repeat_times_match:
-            repeat_times_match = re.fullmatch(r"do\s+(.+)\s+times", text, flags=re.IGNORECASE)
+            repeat_times_match = _DO_TIMES_RE.fullmatch(text)
         if repeat_times_match:
-            body, _, _ = self._parse_block(end_keywords={"end repeat"})
+            body, _, _ = self._parse_block(end_keywords=_END_REPEAT)
             return RepeatTimesStatement(
                 count_expression=repeat_times_match.group(1).strip(),
                 body=body,
-                line=token.line,
+                line=line,
             )
+        return None
 
-        for_each_match = re.fullmatch(
-            r"for\s+(?:each|every)\s+([A-Za-z_][A-Za-z0-9_]*)\s+in\s+(.+)",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_for_each(self, text: str, line: int) -> Optional[Statement]:
+        for_each_match = _FOR_EACH_RE.match(text)
         if for_each_match:
-            body, _, _ = self._parse_block(end_keywords={"end for"})
+            body, _, _ = self._parse_block(end_keywords=_END_FOR)
             return ForEachStatement(
-                item_name=for_each_match.group(1),
+                item_name=sys.intern(for_each_match.group(1)),
                 iterable_expression=for_each_match.group(2).strip(),
                 body=body,
-                line=token.line,
+                line=line,
             )
+        return None
 
-        define_match = re.fullmatch(
-            r"(?:define|function)\s+([A-Za-z_][A-Za-z0-9_]*)(?:\s+with\s+(.+))?",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_define(self, text: str, line: int) -> Optional[Statement]:
+        define_match = _DEFINE_RE.fullmatch(text)
         if define_match:
-            params = self._split_parameters(define_match.group(2) or "", token.line)
-            body, _, _ = self._parse_block(end_keywords={"end define"})
+            params = self._split_parameters(define_match.group(2) or "", line)
+            body, _, _ = self._parse_block(end_keywords=_END_DEFINE)
             return FunctionDefStatement(
-                name=define_match.group(1),
+                name=sys.intern(define_match.group(1)),
                 params=params,
                 body=body,
-                line=token.line,
+                line=line,
             )
+        return None
 
-        break_match = re.fullmatch(r"(?:stop(?:\s+(?:repeat|for|loop))?|break(?:\s+loop)?)", text, flags=re.IGNORECASE)
-        if break_match:
-            return BreakStatement(line=token.line)
+    def _parse_break(self, text: str, line: int) -> Optional[Statement]:
+        if _BREAK_RE.fullmatch(text):
+            return BreakStatement(line=line)
+        return None
 
-        continue_match = re.fullmatch(r"(?:skip(?:\s+(?:repeat|for|loop))?|next(?:\s+loop)?)", text, flags=re.IGNORECASE)
-        if continue_match:
-            return ContinueStatement(line=token.line)
+    def _parse_continue(self, text: str, line: int) -> Optional[Statement]:
+        if _CONTINUE_RE.fullmatch(text):
+            return ContinueStatement(line=line)
+        return None
 
-        return_match = re.fullmatch(r"(?:return|give\s+back)(?:\s+(.+))?", text, flags=re.IGNORECASE)
+    def _parse_return(self, text: str, line: int) -> Optional[Statement]:
+        return_match = _RETURN_RE.fullmatch(text)
         if return_match:
             expression = return_match.group(1).strip() if return_match.group(1) else None
-            return ReturnStatement(expression=expression, line=token.line)
+            return ReturnStatement(expression=expression, line=line)
+        return None
 
-        call_match = re.fullmatch(
-            r"(?:call|run)\s+([A-Za-z_][A-Za-z0-9_]*)(?:\s+with\s+(.+))?",
-            text,
-            flags=re.IGNORECASE,
-        )
+    def _parse_call(self, text: str, line: int) -> Optional[Statement]:
+        call_match = _CALL_RE.fullmatch(text)
         if call_match:
             arguments = self._split_arguments(call_match.group(2) or "")
-            return CallStatement(name=call_match.group(1), arguments=arguments, line=token.line)
-
-        self._raise_unknown_statement(token)
-        raise AssertionError("Unreachable")
+            return CallStatement(name=sys.intern(call_match.group(1)), arguments=arguments, line=line)
+        return None
+
+    # Statement parsers keyed by their lowercased first word, in the order they
+    # must be tried when several statements share a keyword.
+    _STATEMENT_HANDLERS = {
+        "set": (_parse_set,),
+        "let": (_parse_let,),
+        "put": (_parse_put,),
+        "say": (_parse_say,),
+        "print": (_parse_say,),
+        "show": (_parse_say,),
+        "ask": (_parse_ask,),
+        "create": (_parse_create_website, _parse_create_list),
+        "make": (_parse_create_website, _parse_create_list),
+        "build": (_parse_create_website,),
+        "when": (_parse_visit_route, _parse_post_route, _parse_if),
+        "start": (_parse_start_web_server,),
+        "fetch": (_parse_fetch_json, _parse_fetch_text),
+        "add": (_parse_add,),
+        "increase": (_parse_increase,),
+        "subtract": (_parse_subtract,),
+        "decrease": (_parse_decrease,),
+        "multiply": (_parse_multiply,),
+        "divide": (_parse_divide,),
+        "remove": (_parse_remove,),
+        "take": (_parse_remove,),
+        "if": (_parse_if,),
+        "repeat": (_parse_repeat_while, _parse_repeat_times),
+        "while": (_parse_repeat_while,),
+        "do": (_parse_repeat_times,),
+        "for": (_parse_for_each,),
+        "define": (_parse_define,),
+        "function": (_parse_define,),
+        "stop": (_parse_break,),
+        "break": (_parse_break,),
+        "skip": (_parse_continue,),
+        "next": (_parse_continue,),
+        "return": (_parse_return,),
+        "give": (_parse_return,),
+        "call": (_parse_call,),
+        "run": (_parse_call,),
+    }
+    _ALL_STATEMENT_HANDLERS = (
+        _parse_set,
+        _parse_let,
+        _parse_put,
+        _parse_say,
+        _parse_ask,
+        _parse_create_website,
+        _parse_visit_route,
+        _parse_post_route,
+        _parse_start_web_server,
+        _parse_fetch_json,
+        _parse_fetch_text,
+        _parse_create_list,
+        _parse_add,
+        _parse_increase,
+        _parse_subtract,
+        _parse_decrease,
+        _parse_multiply,
+        _parse_divide,
+        _parse_remove,
+        _parse_if,
+        _parse_repeat_while,
+        _parse_repeat_times,
+        _parse_for_each,
+        _parse_define,
+        _parse_break,
+        _parse_continue,
+        _parse_return,
+        _parse_call,
+    )
 
     def _parse_if_statement(self, condition_text: str, if_line: int) -> IfStatement:
         condition = self._parse_condition(condition_text, if_line)
-        if_body, block_end_text, block_line = self._parse_block(
-            end_keywords={"otherwise", "end if"},
-            end_prefixes=self.CLOSING_PREFIXES,
-        )
-        block_end = self._normalize_closing_token(self._canonical(block_end_text)) if block_end_text else None
+        if_body, block_end, block_end_text, block_line = self._parse_if_body()
 
         elif_branches: list[ElseIfBranch] = []
-        while block_end and block_end.startswith("otherwise if "):
+        while block_end is not None and block_end.startswith("otherwise if "):
             branch_line = block_line or if_line
-            raw_end = (block_end_text or "").strip()
-            branch_match = re.fullmatch(r"(?:otherwise|or)\s+if\s+(.+)\s+then", raw_end, flags=re.IGNORECASE)
+            branch_match = _OTHERWISE_IF_RE.fullmatch(block_end_text)
             if not branch_match:
                 raise EppParseError(
                     branch_line,
@@ -620,16 +808,12 @@ class EppParser:
                     "Try: otherwise if score is greater than 100 then",
                 )
             branch_condition = self._parse_condition(branch_condition_raw, branch_line)
-            branch_body, block_end_text, block_line = self._parse_block(
-                end_keywords={"otherwise", "end if"},
-                end_prefixes=self.CLOSING_PREFIXES,
-            )
-            block_end = self._normalize_closing_token(self._canonical(block_end_text)) if block_end_text else None
+            branch_body, block_end, block_end_text, block_line = self._parse_if_body()
             elif_branches.append(ElseIfBranch(condition=branch_condition, body=branch_body, line=branch_line))
 
         else_body: Optional[list[Statement]] = None
         if block_end == "otherwise":
-            else_body, _, _ = self._parse_block(end_keywords={"end if"})
+            else_body, _, _ = self._parse_block(end_keywords=_END_IF)
 
         return IfStatement(
             condition=condition,
@@ -639,33 +823,41 @@ class EppParser:
             line=if_line,
         )
 
+    def _parse_if_body(self) -> tuple[list[Statement], Optional[str], str, Optional[int]]:
+        body, block_end_text, block_line = self._parse_block(
+            end_keywords=_END_IF_OR_OTHERWISE,
+            end_prefixes=self.CLOSING_PREFIXES,
+        )
+        if not block_end_text:
+            return body, None, "", block_line
+        block_end = self._normalize_closing_token(self._canonical(block_end_text))
+        return body, block_end, block_end_text, block_line
+
     def _parse_condition(self, raw_condition: str, line: int) -> Condition:
-        patterns = [
-            (r"(.+?)\s+is\s+greater\s+than\s+or\s+equal\s+to\s+(.+)", ">="),
-            (r"(.+?)\s+is\s+less\s+than\s+or\s+equal\s+to\s+(.+)", "<="),
-            (r"(.+?)\s+is\s+not\s+equal\s+to\s+(.+)", "!="),
-            (r"(.+?)\s+is\s+equal\s+to\s+(.+)", "=="),
-            (r"(.+?)\s+is\s+at\s+least\s+(.+)", ">="),
-            (r"(.+?)\s+is\s+at\s+most\s+(.+)", "<="),
-            (r"(.+?)\s+does\s+not\s+contain\s+(.+)", "not_contains"),
-            (r"(.+?)\s+contains\s+(.+)", "contains"),
-            (r"(.+?)\s+is\s+greater\s+than\s+(.+)", ">"),
-            (r"(.+?)\s+is\s+bigger\s+than\s+(.+)", ">"),
-            (r"(.+?)\s+is\s+less\s+than\s+(.+)", "<"),
-            (r"(.+?)\s+is\s+smaller\s+than\s+(.+)", "<"),
-            (r"(.+?)\s+equals\s+(.+)", "=="),
-            (r"(.+?)\s+is\s+not\s+(.+)", "!="),
-        ]
-        for pattern, operator in patterns:
-            match = re.fullmatch(pattern, raw_condition, flags=re.IGNORECASE)
-            if match:
-                return Condition(
-                    left_expression=match.group(1).strip(),
-                    operator=operator,
-                    right_expression=match.group(2).strip(),
-                    line=line,
-                )
-        return Condition(left_expression=raw_condition.strip(), operator="truthy", right_expression=None, line=line)
+        if len(raw_condition) > _CONDITION_CACHE_MAX_LENGTH:
+            parts = self._split_condition.__wrapped__(raw_condition)
+        else:
+            parts = self._split_condition(raw_condition)
+        left_expression, operator, right_expression = parts
+        return Condition(
+            left_expression=left_expression,
+            operator=operator,
+            right_expression=right_expression,
+            line=line,
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _split_condition(raw_condition: str) -> tuple[str, str, Optional[str]]:
+        match = _CONDITION_RE.fullmatch(raw_condition)
+        if match:
+            right_group = match.lastindex
+            return (
+                match.group(right_group - 1).strip(),
+                _CONDITION_OPERATORS[right_group // 2 - 1],
+                match.group(right_group).strip(),
+            )
+        return raw_condition.strip(), "truthy", None
 
     def _split_parameters(self, raw: str, line: int) -> list[str]:
         if not raw.strip():
@@ -674,19 +866,19 @@ class EppParser:
         if "," in raw:
             parts = [part.strip() for part in raw.split(",")]
         else:
-            parts = [part.strip() for part in re.split(r"\s+and\s+", raw, flags=re.IGNORECASE)]
+            parts = [part.strip() for part in _PARAMETER_SEPARATOR_RE.split(raw)]
 
         params: list[str] = []
         for part in parts:
             if not part:
                 continue
-            if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", part):
+            if not (part.isascii() and part.isidentifier()):
                 raise EppParseError(
                     line,
                     f"'{part}' is not a valid parameter name.",
                     "Use names like 'x', 'total', or 'item_count'.",
                 )
-            params.append(part)
+            params.append(sys.intern(part))
 
         return params
 
@@ -695,43 +887,34 @@ class EppParser:
         if not raw:
             return []
 
+        # Jump between delimiter characters with the precompiled scanner and
+        # slice each argument out of raw; quoted runs are skipped with str.find.
         arguments: list[str] = []
-        chunk: list[str] = []
-        quote_char: Optional[str] = None
         depth = 0
-
-        for character in raw:
-            if quote_char:
-                chunk.append(character)
-                if character == quote_char:
-                    quote_char = None
-                continue
-
-            if character in {'"', "'"}:
-                quote_char = character
-                chunk.append(character)
-                continue
-
-            if character in "([{":
+        start = 0
+        search = _ARGUMENT_DELIMITER_RE.search
+        match = search(raw)
+        while match is not None:
+            character = match.group()
+            position = match.end()
+            if character == '"' or character == "'":
+                closing = raw.find(character, position)
+                if closing < 0:
+                    break
+                position = closing + 1
+            elif character == ",":
+                if depth == 0:
+                    candidate = raw[start : position - 1].strip()
+                    if candidate:
+                        arguments.append(candidate)
+                    start = position
+            elif character in "([{":
                 depth += 1
-                chunk.append(character)
-                continue
-
-            if character in ")]}":
+            else:
                 depth = max(depth - 1, 0)
-                chunk.append(character)
-                continue
-
-            if character == "," and depth == 0:
-                candidate = "".join(chunk).strip()
-                if candidate:
-                    arguments.append(candidate)
-                chunk = []
-                continue
-
-            chunk.append(character)
+            match = search(raw, position)
 
-        candidate = "".join(chunk).strip()
+        candidate = raw[start:].strip()
         if candidate:
             arguments.append(candidate)
 
@@ -747,42 +930,50 @@ class EppParser:
         else:
             first_two = command_key
 
-        suggestion_keys = list(self.COMMAND_SUGGESTIONS.keys())
-        close_match = get_close_matches(command_key, suggestion_keys, n=1, cutoff=0.45)
-        if not close_match:
-            close_match = get_close_matches(first_two, suggestion_keys, n=1, cutoff=0.45)
-
-        suggestion = None
-        if close_match:
-            example = self.COMMAND_SUGGESTIONS[close_match[0]]
-            suggestion = f"Did you mean '{example}'?"
+        suggestion = self._suggest_command(command_key, first_two)
 
         if suggestion is None:
             suggestion = "Try commands like 'set x to 10' or 'say \"Hello\"'."
 
         raise EppParseError(token.line, f"I don't understand '{raw_text}'.", suggestion)
 
-    def _is_closing_keyword(self, canonical: str) -> bool:
-        canonical = self._normalize_closing_token(canonical)
-        if canonical in self.CLOSING_KEYWORDS:
-            return True
-        return any(canonical.startswith(prefix) for prefix in self.CLOSING_PREFIXES)
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _suggest_command(command_key: str, first_two: str) -> Optional[str]:
+        candidates = EppParser._suggestion_candidates
+        close_match = get_close_matches(command_key, candidates(command_key), n=1, cutoff=_SUGGESTION_CUTOFF)
+        if not close_match:
+            close_match = get_close_matches(first_two, candidates(first_two), n=1, cutoff=_SUGGESTION_CUTOFF)
 
-    def _has_more(self) -> bool:
-        return self.position < len(self.tokens)
+        if close_match:
+            example = EppParser.COMMAND_SUGGESTIONS[close_match[0]]
+            return f"Did you mean '{example}'?"
+        return None
 
-    def _advance(self) -> LineToken:
-        token = self.tokens[self.position]
-        self.position += 1
-        return token
+    @staticmethod
+    def _suggestion_candidates(text: str) -> list[str]:
+        # A key can only reach the cutoff if 2 * min(len) / (total len) does,
+        # which is the same bound difflib's real_quick_ratio() applies per key.
+        text_length = len(text)
+        candidates: list[str] = []
+        for key_length, keys in EppParser._SUGGESTION_KEYS_BY_LENGTH.items():
+            if 2.0 * min(text_length, key_length) / (text_length + key_length) >= _SUGGESTION_CUTOFF:
+                candidates.extend(keys)
+        return candidates
+
+    def _is_closing_keyword(self, normalized: str) -> bool:
+        return normalized in self.CLOSING_KEYWORDS or normalized.startswith(self.CLOSING_PREFIXES)
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def _canonical(text: str) -> str:
         return " ".join(text.strip().lower().split())
 
     def _normalize_closing_token(self, canonical: str) -> str:
         normalized = self.CLOSING_ALIASES.get(canonical, canonical)
-        for alias, target_prefix in self.CLOSING_PREFIX_ALIASES.items():
+        prefix_alias = self._PREFIX_ALIAS_BY_FIRST_WORD.get(normalized.partition(" ")[0])
+        if prefix_alias is not None:
+            alias, target_prefix = prefix_alias
             if normalized.startswith(alias):
                 return target_prefix + normalized[len(alias) :]
         return normalized
@@ -8,28 +8,190 @@ Usage:
 from __future__ import annotations
 
 import argparse
+from functools import lru_cache
+import hashlib
+import os
 from pathlib import Path
-from typing import Optional
+import pickle
+from typing import Callable, Iterable, Optional
 
 from epp_interpreter import EppFunction, EppInterpreter, EppRuntimeError
-from epp_lexer import EppLexer, EppLexerError
-from epp_parser import EppParseError, EppParser
+from epp_lexer import EppLexer, EppLexerError, LineToken
+from epp_optimizer import fold
+from epp_parser import EppParseError, EppParser, Program
 
 VERSION = "0.2.0"
 
+# EppLexer keeps no state between calls, so one instance serves every run.
+_DEFAULT_LEXER = EppLexer()
 
-def execute_source(source: str, interpreter: EppInterpreter, check_only: bool = False) -> int:
-    """Tokenize, parse, and execute a source string."""
+_CACHE_DIR_NAME = "epp"
 
-    lexer = EppLexer()
+
+@lru_cache(maxsize=256)
+def _tokenize_and_parse(
+    source: str,
+    optimize: bool = True,
+) -> tuple[Optional[Program], Optional[EppLexerError | EppParseError]]:
+    """Return (program, None) or (None, error), cached by source text.
+
+    The interpreter never modifies a Program, so cached ones can be shared.
+    """
+
+    return _tokenize_and_parse_with(_DEFAULT_LEXER, source, optimize)
+
+
+def _tokenize_and_parse_with(
+    lexer: EppLexer,
+    source: str,
+    optimize: bool = True,
+) -> tuple[Optional[Program], Optional[EppLexerError | EppParseError]]:
     try:
         tokens = lexer.tokenize(source)
+    except EppLexerError as exc:
+        return None, exc
+    return _parse_tokens(tokens, optimize)
+
+
+def _parse_tokens(
+    tokens: list[LineToken],
+    optimize: bool = True,
+) -> tuple[Optional[Program], Optional[EppParseError]]:
+    try:
+        program = EppParser(tokens).parse()
+    except EppParseError as exc:
+        return None, exc
+    return (fold(program) if optimize else program), None
+
+
+def _parse_lines(
+    lines: Iterable[str],
+    optimize: bool = True,
+) -> tuple[Optional[Program], Optional[EppLexerError | EppParseError]]:
+    """Parse source lines as they are read instead of joining them first."""
+
+    tokens = _DEFAULT_LEXER.tokenize_lines(lines)
+    try:
         program = EppParser(tokens).parse()
     except EppLexerError as exc:
-        print(exc)
-        return 1
+        return None, exc
     except EppParseError as exc:
-        print(exc)
+        # tokenize() checks the whole source up front, so a bad character
+        # further down the file is still reported ahead of a parse error.
+        try:
+            for _ in tokens:
+                pass
+        except EppLexerError as lexer_exc:
+            return None, lexer_exc
+        return None, exc
+    return (fold(program) if optimize else program), None
+
+
+def _parse_file(
+    path: Path,
+    optimize: bool = True,
+) -> tuple[Optional[Program], Optional[EppLexerError | EppParseError]]:
+    with path.open("r", encoding="utf-8-sig") as handle:
+        return _parse_lines(handle, optimize)
+
+
+def _cache_dir() -> Path:
+    """Return this user's E++ cache directory, outside any script's folder."""
+
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / _CACHE_DIR_NAME
+
+
+def _parse_file_cached(
+    path: Path,
+    optimize: bool = True,
+) -> tuple[Optional[Program], Optional[EppLexerError | EppParseError]]:
+    """Like _parse_file, but reuse a program pickled by an earlier run.
+
+    Entries are keyed by a blake2b hash of the script's bytes and live in the
+    per-user cache directory, never next to the script: unpickling runs code,
+    so the cache must not be something a script's folder or archive can bring.
+    """
+
+    data = path.read_bytes()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    stamp = (VERSION, optimize, len(data), digest)
+    cache_dir = _cache_dir()
+    cache_path = cache_dir / f"{digest}{'' if optimize else '-unoptimized'}.pickle"
+    try:
+        if _is_private(cache_dir.stat()):
+            with cache_path.open("rb") as handle:
+                entry_stat = os.fstat(handle.fileno())
+                # The size check is a cheap guard before unpickling; the stamp inside
+                # repeats the size and hash.
+                if _is_private(entry_stat) and entry_stat.st_size > 0:
+                    cached_stamp, program = pickle.load(handle)
+                    if cached_stamp == stamp and isinstance(program, Program):
+                        return program, None
+    except Exception:
+        # A missing, stale-format or damaged cache just means parsing again.
+        pass
+
+    program, error = _parse_lines((data.decode("utf-8-sig"),), optimize)
+    if program is not None:
+        temporary_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            if _is_private(cache_dir.stat()):
+                # Explicit permissions, so a group-writable umask can't make the
+                # file one that the loader refuses.
+                descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(descriptor, "wb") as handle:
+                    pickle.dump((stamp, program), handle, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary_path, cache_path)
+        except Exception:
+            # Pickling very deep programs can fail too; the cache is only a shortcut.
+            try:
+                temporary_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+    return program, error
+
+
+def _is_private(stat_result: os.stat_result) -> bool:
+    """True if the stat belongs to the current user and nobody else may write to it."""
+
+    if not hasattr(os, "getuid"):
+        # No owner ids to compare (Windows); the cache sits in the user's own profile.
+        return True
+    return stat_result.st_uid == os.getuid() and not stat_result.st_mode & 0o022
+
+
+def execute_source(
+    source: str,
+    interpreter: EppInterpreter,
+    check_only: bool = False,
+    lexer: Optional[EppLexer] = None,
+    optimize: bool = True,
+) -> int:
+    """Tokenize, parse, optionally fold, and execute a source string.
+
+    Without an explicit lexer the shared default is used and results are cached.
+    """
+
+    if lexer is None:
+        program, error = _tokenize_and_parse(source, optimize)
+    else:
+        program, error = _tokenize_and_parse_with(lexer, source, optimize)
+    return _run_program(program, error, interpreter, check_only)
+
+
+def _run_program(
+    program: Optional[Program],
+    error: Optional[EppLexerError | EppParseError],
+    interpreter: EppInterpreter,
+    check_only: bool,
+) -> int:
+    if error is not None:
+        print(error)
         return 1
 
     if check_only:
@@ -43,7 +205,13 @@ def execute_source(source: str, interpreter: EppInterpreter, check_only: bool =
     return 0
 
 
-def run_file(path: Path, check_only: bool = False, max_loop_iterations: int = 100_000) -> int:
+def run_file(
+    path: Path,
+    check_only: bool = False,
+    max_loop_iterations: int = 100_000,
+    optimize: bool = True,
+    use_cache: bool = True,
+) -> int:
     """Run a .epp script file."""
 
     if not path.exists():
@@ -54,23 +222,32 @@ def run_file(path: Path, check_only: bool = False, max_loop_iterations: int = 10
         print(f"Oops! '{path}' is not a file.")
         return 1
 
-    source = path.read_text(encoding="utf-8-sig")
+    if use_cache:
+        program, error = _parse_file_cached(path, optimize)
+    else:
+        program, error = _parse_file(path, optimize)
     interpreter = EppInterpreter(max_loop_iterations=max_loop_iterations)
-    status = execute_source(source, interpreter, check_only=check_only)
+    status = _run_program(program, error, interpreter, check_only)
     if status == 0 and check_only:
         print(f"Looks good! '{path}' has no syntax errors.")
     return status
 
 
-def run_repl(max_loop_iterations: int = 100_000) -> int:
+def run_repl(max_loop_iterations: int = 100_000, optimize: bool = True) -> int:
     """Start an interactive E++ shell."""
 
     print("E++ REPL")
     print("Type E++ lines. Use 'exit' or 'quit' to leave. Type ':help' for REPL commands.")
 
-    lexer = EppLexer()
+    try:
+        import readline  # noqa: F401, PLC0415  (line editing and history for input())
+    except Exception:
+        pass
+
     interpreter = EppInterpreter(max_loop_iterations=max_loop_iterations)
-    buffer: list[str] = []
+    # Tokens for the lines of the entry being typed; each new line is lexed
+    # once and appended instead of re-lexing the whole entry.
+    buffer: list[LineToken] = []
 
     while True:
         prompt = "epp> " if not buffer else "... "
@@ -87,22 +264,28 @@ def run_repl(max_loop_iterations: int = 100_000) -> int:
             continue
 
         if not buffer and line.strip().startswith(":"):
-            _handle_repl_command(line.strip(), interpreter)
+            _handle_repl_command(line.strip(), interpreter, optimize=optimize)
             continue
 
-        buffer.append(line)
-
         try:
-            tokens = lexer.tokenize("\n".join(buffer))
-            program = EppParser(tokens).parse()
-        except EppParseError as exc:
-            if exc.incomplete:
-                continue
+            new_tokens = list(_DEFAULT_LEXER.tokenize_lines((line + "\n",), start_line=len(buffer) + 1))
+        except EppLexerError as exc:
             print(exc)
             buffer.clear()
             continue
-        except EppLexerError as exc:
-            print(exc)
+
+        # The entry so far is still waiting for a closing word, so unless the new
+        # line could close a block, parsing everything again would only say so once more.
+        still_open = bool(buffer) and _keeps_entry_open(new_tokens)
+        buffer.extend(new_tokens)
+        if still_open:
+            continue
+
+        program, error = _parse_tokens(buffer, optimize)
+        if error is not None:
+            if isinstance(error, EppParseError) and error.incomplete:
+                continue
+            print(error)
             buffer.clear()
             continue
 
@@ -114,7 +297,22 @@ def run_repl(max_loop_iterations: int = 100_000) -> int:
             buffer.clear()
 
 
-def main(argv: Optional[list[str]] = None) -> int:
+def _keeps_entry_open(tokens: list[LineToken]) -> bool:
+    """Return True if appending tokens to an unfinished entry leaves it unfinished.
+
+    That holds when the tokens parse on their own, or stop only because a block
+    they open is not closed yet. Anything else, including a closing word, needs
+    the whole entry parsed to find out what it does.
+    """
+
+    try:
+        EppParser(tokens).parse()
+    except EppParseError as exc:
+        return exc.incomplete
+    return True
+
+
+def _build_argparser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Run E++ scripts or launch the E++ REPL.")
     parser.add_argument("--check", action="store_true", help="Validate syntax without executing the script.")
     parser.add_argument(
@@ -123,8 +321,26 @@ def main(argv: Optional[list[str]] = None) -> int:
         default=100_000,
         help="Safety limit for total loop iterations before stopping runaway loops.",
     )
+    parser.add_argument(
+        "--no-optimize",
+        action="store_true",
+        help="Run the program exactly as parsed, without constant folding.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse the script instead of reusing a cached parse.",
+    )
     parser.add_argument("--version", action="version", version=f"E++ {VERSION}")
     parser.add_argument("script", nargs="?", help="Path to a .epp file")
+    return parser
+
+
+_ARGPARSER = _build_argparser()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = _ARGPARSER
     args = parser.parse_args(argv)
 
     if args.max_loop_iterations <= 0:
@@ -138,55 +354,71 @@ def main(argv: Optional[list[str]] = None) -> int:
             Path(args.script),
             check_only=args.check,
             max_loop_iterations=args.max_loop_iterations,
+            optimize=not args.no_optimize,
+            use_cache=not args.no_cache,
         )
-    return run_repl(max_loop_iterations=args.max_loop_iterations)
+    return run_repl(max_loop_iterations=args.max_loop_iterations, optimize=not args.no_optimize)
 
 
-def _handle_repl_command(command: str, interpreter: EppInterpreter) -> None:
-    if command == ":help":
-        print("REPL commands:")
-        print("  :help            Show this help")
-        print("  :vars            Show global variables")
-        print("  :reset           Clear all variables and functions")
-        print("  :load <file>     Run a .epp file in current REPL state")
-        return
+def _repl_help(argument: str, interpreter: EppInterpreter, optimize: bool) -> None:
+    print("REPL commands:")
+    print("  :help            Show this help")
+    print("  :vars            Show global variables")
+    print("  :reset           Clear all variables and functions")
+    print("  :load <file>     Run a .epp file in current REPL state")
 
-    if command == ":vars":
-        globals_map = interpreter.global_scope
-        if not globals_map:
-            print("(no variables yet)")
-            return
-
-        for name in sorted(globals_map):
-            value = globals_map[name]
-            if isinstance(value, EppFunction):
-                params = ", ".join(value.params) if value.params else ""
-                print(f"{name} = <function({params})>")
-            else:
-                print(f"{name} = {value!r}")
-        return
 
-    if command == ":reset":
-        interpreter.global_scope.clear()
-        interpreter.scopes = [interpreter.global_scope]
-        interpreter.loop_iterations = 0
-        print("Environment reset.")
+def _repl_vars(argument: str, interpreter: EppInterpreter, optimize: bool) -> None:
+    globals_map = interpreter.global_scope
+    if not globals_map:
+        print("(no variables yet)")
         return
 
-    if command.startswith(":load "):
-        file_path = command[len(":load ") :].strip().strip('"')
-        if not file_path:
-            print("Please provide a file path. Example: :load examples/hello.epp")
-            return
-        path = Path(file_path)
-        if not path.exists() or not path.is_file():
-            print(f"Oops! I can't find '{file_path}'.")
-            return
-        source = path.read_text(encoding="utf-8-sig")
-        execute_source(source, interpreter, check_only=False)
+    lines = []
+    for name, value in sorted(globals_map.items()):
+        if isinstance(value, EppFunction):
+            lines.append(f"{name} = <function({', '.join(value.params)})>")
+        else:
+            lines.append(f"{name} = {value!r}")
+    print("\n".join(lines))
+
+
+def _repl_reset(argument: str, interpreter: EppInterpreter, optimize: bool) -> None:
+    interpreter.reset()
+    interpreter.loop_iterations = 0
+    print("Environment reset.")
+
+
+def _repl_load(argument: str, interpreter: EppInterpreter, optimize: bool) -> None:
+    file_path = argument.strip().strip('"')
+    if not file_path:
+        print("Please provide a file path. Example: :load examples/hello.epp")
         return
+    path = Path(file_path)
+    if not path.exists() or not path.is_file():
+        print(f"Oops! I can't find '{file_path}'.")
+        return
+    program, error = _parse_file(path, optimize)
+    _run_program(program, error, interpreter, check_only=False)
+
 
-    print("Unknown REPL command. Type ':help' to see available commands.")
+_REPL_COMMANDS: dict[str, Callable[[str, EppInterpreter, bool], None]] = {
+    ":help": _repl_help,
+    ":vars": _repl_vars,
+    ":reset": _repl_reset,
+    ":load": _repl_load,
+}
+# Commands that take an argument after a space; the rest must be typed alone.
+_REPL_COMMANDS_WITH_ARGUMENT = frozenset({":load"})
+
+
+def _handle_repl_command(command: str, interpreter: EppInterpreter, optimize: bool = True) -> None:
+    verb, separator, argument = command.partition(" ")
+    handler = _REPL_COMMANDS.get(verb)
+    if handler is None or bool(separator) != (verb in _REPL_COMMANDS_WITH_ARGUMENT):
+        print("Unknown REPL command. Type ':help' to see available commands.")
+        return
+    handler(argument, interpreter, optimize)
 
 
 if __name__ == "__main__":
@@ -2,15 +2,22 @@
 
 from __future__ import annotations
 
+import contextlib
+import io
+import os
+from pathlib import Path
+import tempfile
 import unittest
+from unittest import mock
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import json
 import threading
 
-from epp_interpreter import EppInterpreter, EppRuntimeError
+from epp_interpreter import EppInterpreter, EppRuntimeError, PixelWindow
 from epp_lexer import EppLexer
-from epp_parser import EppParser
-from epp_runner import execute_source
+from epp_optimizer import fold
+from epp_parser import EppParseError, EppParser, IfStatement, SayStatement
+from epp_runner import execute_source, run_file
 
 
 def run_source(source: str, inputs: list[str] | None = None) -> tuple[int, list[str]]:
@@ -148,6 +155,33 @@ say total
         self.assertEqual(status, 0)
         self.assertEqual(output, ["6"])
 
+    def test_stop_and_skip_inside_function_act_on_caller_loop(self) -> None:
+        source = """
+define leave with n
+  if n equals 2 then
+    stop repeat
+  end if
+  skip repeat
+end define
+set i to 0
+repeat 5 times
+  increase i by 1
+  call leave with i
+  say "never"
+end repeat
+say i
+""".strip()
+        status, output = run_source(source)
+        self.assertEqual(status, 0)
+        self.assertEqual(output, ["2"])
+
+        program = EppParser(EppLexer().tokenize(source + "\ncall leave with 2")).parse()
+        interpreter = EppInterpreter(output_fn=lambda _: None)
+        with self.assertRaises(EppRuntimeError) as context:
+            interpreter.execute(program)
+        self.assertEqual(context.exception.line, 3)
+        self.assertIn("'stop' outside of a loop", str(context.exception))
+
     def test_call_expression_and_return_value(self) -> None:
         status, output = run_source(
             """
@@ -161,6 +195,90 @@ say value
         self.assertEqual(status, 0)
         self.assertEqual(output, ["7"])
 
+    def test_single_return_functions_see_caller_scopes(self) -> None:
+        status, output = run_source(
+            """
+define scaled with v
+  return v * factor
+end define
+define outer with factor
+  return call scaled with 10
+end define
+set factor to 3
+say scaled(2)
+say outer(7)
+set factor to 5
+say scaled(2)
+""".strip()
+        )
+        self.assertEqual(status, 0)
+        self.assertEqual(output, ["6", "70", "10"])
+
+        source = """
+define broken with v
+  return v + missing_name
+end define
+say broken(1)
+""".strip()
+        program = EppParser(EppLexer().tokenize(source)).parse()
+        interpreter = EppInterpreter(output_fn=lambda _: None)
+        with self.assertRaises(EppRuntimeError) as context:
+            interpreter.execute(program)
+        self.assertIn("On line 2, I can't find 'missing_name'", str(context.exception))
+
+    def test_self_tail_call_runs_without_deep_recursion(self) -> None:
+        status, output = run_source(
+            """
+define total_down with n and acc
+  if n equals 0 then
+    return acc
+  end if
+  repeat 1 times
+    return call total_down with n - 1, acc + n
+  end repeat
+end define
+say call total_down with 5000, 0
+""".strip()
+        )
+        self.assertEqual(status, 0)
+        self.assertEqual(output, ["12502500"])
+
+    def test_self_tail_calls_do_not_use_the_loop_budget(self) -> None:
+        status, output = run_source(
+            """
+define count_down with n
+  if n equals 0 then
+    return "done"
+  end if
+  return call count_down with n - 1
+end define
+set result to ""
+repeat 2000 times
+  set result to count_down(60)
+end repeat
+say result
+""".strip()
+        )
+        self.assertEqual(status, 0)
+        self.assertEqual(output, ["done"])
+
+    def test_expressions_see_variable_changes_between_runs_and_after_reset(self) -> None:
+        output: list[str] = []
+        interpreter = EppInterpreter(output_fn=lambda value: output.append(str(value)))
+
+        def run(source: str) -> None:
+            interpreter.execute(EppParser(EppLexer().tokenize(source)).parse())
+
+        run("set x to 1\nsay x + 1\nadd 2 to x\nsay x + 1")
+        interpreter.global_scope["x"] = 10
+        run("say x + 1")
+        self.assertEqual(output, ["2", "4", "11"])
+
+        interpreter.reset()
+        with self.assertRaises(EppRuntimeError) as context:
+            run("say x + 1")
+        self.assertIn("I can't find 'x'", str(context.exception))
+
     def test_contains_condition(self) -> None:
         status, output = run_source(
             """
@@ -191,6 +309,136 @@ end repeat
             interpreter.execute(program)
         self.assertIn("running forever", str(context.exception))
 
+    def test_tokenize_lines_matches_tokenize(self) -> None:
+        source = "\ufeffsay 1\r\n  # note\n\nsay 2\x0bsay 3\n"
+        lexer = EppLexer()
+        expected = lexer.tokenize(source)
+        self.assertEqual(list(lexer.tokenize_lines(source.splitlines(keepends=True))), expected)
+        self.assertEqual([token.line for token in lexer.tokenize_lines(["say 1\n"], start_line=5)], [5])
+
+    def test_parser_accepts_a_token_stream(self) -> None:
+        source = "set x to 1\nrepeat 2 times\n  add 1 to x\nend repeat\nif x equals 3 then\n  say x\n"
+        program = EppParser(iter(EppLexer().tokenize(source + "end if"))).parse()
+        self.assertEqual(len(program.statements), 3)
+
+        with self.assertRaises(EppParseError) as context:
+            EppParser(iter(EppLexer().tokenize(source + "\n"))).parse()
+        self.assertEqual(context.exception.line, 7)
+        self.assertTrue(context.exception.incomplete)
+
+    def test_optimizer_folds_constants_and_drops_dead_branches(self) -> None:
+        source = """
+set x to 2 * 30
+if 3 is greater than 5 then
+  say "never"
+otherwise if x equals 60 then
+  say "a" + "b"
+end if
+if true then
+  say 10 / 4
+end if
+repeat while false
+  say "never"
+end repeat
+say "true" + " story"
+""".strip()
+        program = fold(EppParser(EppLexer().tokenize(source)).parse())
+        self.assertEqual(program.statements[0].expression, "60")
+        branch = program.statements[1]
+        self.assertIsInstance(branch, IfStatement)
+        self.assertEqual(branch.condition.right_expression, "60")
+        self.assertEqual(branch.body[0].expression, "'ab'")
+        self.assertEqual(branch.elif_branches, [])
+        self.assertEqual(program.statements[2], SayStatement(expression="2.5", line=8))
+        self.assertEqual(len(program.statements), 4)
+
+        status, output = run_source(source)
+        self.assertEqual(status, 0)
+        self.assertEqual(output, ["ab", "2.5", "True story"])
+
+    def test_optimizer_leaves_very_long_expressions_unfolded(self) -> None:
+        terms = " + ".join(["x"] * 1200)
+        status, output = run_source(f"set x to 1\nsay {terms}\nsay {' + '.join(['1'] * 1200)}")
+        self.assertEqual(status, 0)
+        self.assertEqual(output, ["1200", "1200"])
+
+    def test_optimizer_drops_statements_after_return_stop_and_skip(self) -> None:
+        source = """
+define pick with n
+  repeat 3 times
+    if true then
+      skip repeat
+      say "never"
+    end if
+    say "never"
+  end repeat
+  return n
+  say "never"
+end define
+say pick(4)
+""".strip()
+        program = fold(EppParser(EppLexer().tokenize(source)).parse())
+        function = program.statements[0]
+        self.assertEqual(len(function.body), 2)
+        self.assertEqual(len(function.body[0].body), 1)
+
+        status, output = run_source(source)
+        self.assertEqual(status, 0)
+        self.assertEqual(output, ["4"])
+
+    def test_run_file_reuses_cached_program_until_script_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            cache_dir = Path(directory) / "cache"
+            script = Path(directory) / "cached.epp"
+            script.write_text('say "first"\n', encoding="utf-8")
+            outputs = []
+            with mock.patch("epp_runner._cache_dir", return_value=cache_dir):
+                for _ in range(2):
+                    buffer = io.StringIO()
+                    with contextlib.redirect_stdout(buffer):
+                        self.assertEqual(run_file(script), 0)
+                    outputs.append(buffer.getvalue())
+                self.assertEqual(len(list(cache_dir.glob("*.pickle"))), 1)
+
+                # Same size and modification time: only the contents tell them apart.
+                stat = script.stat()
+                script.write_text('say "other"\n', encoding="utf-8")
+                os.utime(script, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                buffer = io.StringIO()
+                with contextlib.redirect_stdout(buffer):
+                    self.assertEqual(run_file(script), 0)
+                outputs.append(buffer.getvalue())
+            self.assertFalse((Path(directory) / "__eppcache__").exists())
+        self.assertEqual(outputs, ["first\n", "first\n", "other\n"])
+
+    def test_run_file_survives_a_cache_that_cannot_be_written(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            cache_dir = Path(directory) / "cache"
+            script = Path(directory) / "deep.epp"
+            script.write_text('say "ran"\n', encoding="utf-8")
+            buffer = io.StringIO()
+            with (
+                mock.patch("epp_runner._cache_dir", return_value=cache_dir),
+                mock.patch("epp_runner.pickle.dump", side_effect=RecursionError),
+                contextlib.redirect_stdout(buffer),
+            ):
+                self.assertEqual(run_file(script), 0)
+            self.assertEqual(buffer.getvalue(), "ran\n")
+            self.assertEqual(list(cache_dir.iterdir()), [])
+
+    def test_unlisted_keys_get_bits_per_window(self) -> None:
+        first, second = PixelWindow(), PixelWindow()
+        first._on_key_press(mock.Mock(keysym="F13"))
+        self.assertTrue(first.key_down("f13"))
+        self.assertTrue(first.key_pressed("F13"))
+        self.assertFalse(second.key_down("f13"))
+
+        first._on_key_release(mock.Mock(keysym="F13"))
+        self.assertFalse(first.key_down("f13"))
+        second._on_key_press(mock.Mock(keysym="Left"))
+        self.assertTrue(second.key_down("left"))
+        self.assertFalse(first.key_down("left"))
+
     def test_pixel_game_builtins_are_available(self) -> None:
         interpreter = EppInterpreter(output_fn=lambda _: None)
         namespace = interpreter._base_namespace()
@@ -212,6 +460,7 @@ end repeat
             "make_html_page",
             "fetch_from_api",
             "fetch_json_from_api",
+            "fetch_many",
             "open_window",
             "close_window",
             "window_is_open",
@@ -221,6 +470,7 @@ end repeat
             "clear_screen",
             "draw_pixel",
             "draw_rect",
+            "draw_pixels",
             "draw_text",
             "key_down",
             "key_pressed",
@@ -268,6 +518,18 @@ end if
         self.assertEqual(status, 0)
         self.assertEqual(output, ["ok1", "ok2", "ok3", "ok4"])
 
+    def test_set_seed_makes_random_repeatable(self) -> None:
+        source = """
+call set_seed with 42
+say random_int(1, 1000)
+say random between 1 and 1000
+say random choice from [1, 2, 3, 4, 5, 6, 7, 8, 9]
+""".strip()
+        first_status, first_output = run_source(source)
+        second_status, second_output = run_source(source)
+        self.assertEqual((first_status, second_status), (0, 0))
+        self.assertEqual(first_output, second_output)
+
     def test_flask_like_builtin_routes_work_without_external_dependencies(self) -> None:
         interpreter = EppInterpreter(output_fn=lambda _: None)
         namespace = interpreter._base_namespace()
@@ -399,6 +661,53 @@ say payload["status"]
             server.server_close()
             thread.join(timeout=1.0)
 
+    def test_fetch_reuses_keep_alive_connection(self) -> None:
+        client_ports: list[int] = []
+
+        class KeepAliveHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802
+                client_ports.append(int(self.client_address[1]))
+                if self.path == "/moved":
+                    self.send_response(302)
+                    self.send_header("Location", "/text")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                payload = b"kept-alive"
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args: object) -> None:  # noqa: A003
+                return
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        port = int(server.server_address[1])
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            interpreter = EppInterpreter(output_fn=lambda _: None)
+            namespace = interpreter._base_namespace()
+            base_url = f"http://127.0.0.1:{port}"
+
+            self.assertEqual(namespace["fetch_from_api"](f"{base_url}/text"), "kept-alive")
+            self.assertEqual(namespace["fetch_from_api"](f"{base_url}/moved"), "kept-alive")
+            self.assertEqual(len(client_ports), 3)
+            self.assertEqual(len(set(client_ports)), 1)
+
+            texts = namespace["fetch_many"]([f"{base_url}/text", f"{base_url}/moved"])
+            self.assertEqual(texts, ["kept-alive", "kept-alive"])
+        finally:
+            interpreter._http.close()
+            server.shutdown()
+            server.server_close()
+            thread.join(timeout=1.0)
+
     def test_english_web_syntax_is_supported(self) -> None:
         status, output = run_source(
             """